@@ -0,0 +1 @@
+"""Local enaio stand-in and throughput benchmarks"""
@@ -0,0 +1,207 @@
+"""Throughput benchmarks for dmsapi and the flask routes
+
+Starts the local fake DMS, points the app at it and measures search,
+dry run and update for growing result sizes, e.g.
+
+    python -m benchmarks.bench_dms --sizes 100 1000 10000 --latency-ms 2
+
+Reports objects per second and the p50/p99 latency of the DMS requests
+sent during each phase.
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .fake_dms import FakeDMS, OBJECT_TYPE_NAME, serve
+
+
+class LatencyRecorder:
+    """Wraps DMSClient.request to collect the latency of every DMS request"""
+
+    def __init__(self, client):
+        self.samples = []
+        self._request = client.request
+        client.request = self._timed_request
+
+    def _timed_request(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._request(*args, **kwargs)
+        finally:
+            self.samples.append(time.perf_counter() - started)
+
+    def reset(self):
+        samples, self.samples = self.samples, []
+        return samples
+
+
+def percentile(samples, percent):
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(int(round(percent / 100 * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def measure(name, size, recorder, func):
+    """Run func once and summarize its throughput and DMS request latencies"""
+    recorder.reset()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    samples = recorder.reset()
+    return {
+        "phase": name,
+        "objects": size,
+        "seconds": round(elapsed, 3),
+        "objects_per_second": round(size / elapsed, 1) if elapsed else 0.0,
+        "dms_requests": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 2) if samples else 0.0,
+    }
+
+
+def wait_for_job(test_client, location, timeout=3600):
+    """Poll a job started by a route until it is finished"""
+    job_id = location.rstrip("/").split("/")[-2]
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = test_client.get(f"/jobs/{job_id}").get_json()["status"]
+        if status in ("finished", "failed", "cancelled"):
+            test_client.get(location).get_data()
+            return status
+        time.sleep(0.05)
+    raise TimeoutError(f"Job {job_id} did not finish")
+
+
+def run_size(app, fake_dms, recorder, size):
+    """All benchmark phases for one result size"""
+    from interactive_dms_service.dmsapi import iter_search, call_dryrun, call_update
+
+    fake_dms.load(size)
+    results = []
+
+    with app.app_context():
+        objects = []
+
+        def search():
+            for page in iter_search("*", OBJECT_TYPE_NAME, "1=1"):
+                objects.extend(
+                    {
+                        "objectId": dms_object["properties"]["system:objectId"]["value"],
+                        "objectTypeId": dms_object["properties"]["system:objectTypeId"]["value"],
+                    }
+                    for dms_object in page
+                )
+
+        results.append(measure("dmsapi.iter_search", size, recorder, search))
+
+        dryrun_data = {}
+
+        def dryrun_get():
+            dryrun_data.update(call_dryrun(objects, "status", "closed", lookup="get"))
+
+        def dryrun_search():
+            dryrun_data.update(call_dryrun(objects, "status", "closed", lookup="search", object_type=OBJECT_TYPE_NAME))
+
+        results.append(measure("dmsapi.call_dryrun[get]", size, recorder, dryrun_get))
+        results.append(measure("dmsapi.call_dryrun[search]", size, recorder, dryrun_search))
+
+        payloads = dryrun_data.get("result_payloads", [])
+        results.append(measure("dmsapi.call_update", len(payloads), recorder, lambda: call_update(payloads)))
+
+    fake_dms.load(size)
+    test_client = app.test_client()
+
+    def route_result():
+        test_client.get(f"/result?folder={OBJECT_TYPE_NAME}&field=*&condition=1=1").get_data()
+
+    def route_dryrun():
+        response = test_client.get("/dryrun?field=status&new_value=closed")
+        wait_for_job(test_client, response.headers["Location"])
+
+    def route_execute():
+        response = test_client.post("/execute", data={"execute": "Execute Update"})
+        wait_for_job(test_client, response.headers["Location"])
+
+    results.append(measure("route /result", size, recorder, route_result))
+    results.append(measure("route /dryrun", size, recorder, route_dryrun))
+    results.append(measure("route /execute", size, recorder, route_execute))
+
+    return results
+
+
+def print_table(results):
+    columns = ["phase", "objects", "seconds", "objects_per_second", "dms_requests", "p50_ms", "p99_ms"]
+    widths = {
+        column: max(len(column), *(len(str(row[column])) for row in results)) for column in columns
+    }
+    print("  ".join(column.ljust(widths[column]) for column in columns))
+    for row in results:
+        print("  ".join(str(row[column]).ljust(widths[column]) for column in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--fields", type=int, default=5)
+    parser.add_argument("--value-size", type=int, default=16)
+    parser.add_argument("--json", dest="json_file", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    fake_dms = FakeDMS(
+        objects=0, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, fields=args.fields, value_size=args.value_size
+    )
+    server = serve(fake_dms)
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    # the app reads its configuration from the environment on import
+    work_dir = Path(tempfile.mkdtemp(prefix="dms_bench_"))
+    os.environ.update({
+        "API_HOST": f"127.0.0.1:{server.server_port}",
+        "LOG_LEVEL": "WARNING",
+        "LOG_DIRECTORY": str(work_dir / "logs"),
+        "SESSION_FILE_DIR": str(work_dir / "flask_session"),
+        "SESSION_SQLITE_PATH": str(work_dir / "flask_session" / "sessions.sqlite3"),
+        "RESULT_STORE_PATH": str(work_dir / "results.sqlite3"),
+        "UPDATE_JOURNAL_DIR": str(work_dir / "update_journal"),
+        "UPLOAD_DIR": str(work_dir / "uploads"),
+        "SEARCH_MAX_ITEMS": "0",
+        # every phase measures the DMS round trips, not the search cache
+        "SEARCH_CACHE_TTL": "0",
+    })
+    from interactive_dms_service import create_app
+
+    app = create_app()
+    app.config["WTF_CSRF_ENABLED"] = False
+    recorder = LatencyRecorder(app.extensions["dms_client"])
+
+    all_results = []
+    try:
+        for size in args.sizes:
+            all_results.extend(run_size(app, fake_dms, recorder, size))
+    finally:
+        server.shutdown()
+
+    print_table(all_results)
+    if args.json_file:
+        Path(args.json_file).write_text(json.dumps(all_results, indent=2))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""Local stand-in for the enaio DMS Service API
+
+Implements the endpoints used by dmsapi with in-memory objects and
+configurable latency, error rate and data size. Run standalone with
+
+    python -m benchmarks.fake_dms --objects 10000 --latency-ms 5
+"""
+
+import argparse
+import random
+import re
+import threading
+import time
+from flask import Flask, request
+from werkzeug.serving import make_server
+
+OBJECT_TYPE_ID = "4711"
+OBJECT_TYPE_NAME = "benchfolder"
+
+
+class FakeDMS:
+    """In-memory object repository with simulated latency and errors"""
+
+    def __init__(self, objects=1000, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                 fields=5, value_size=16, seed=42):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = {"info": 0, "search": 0, "object_get": 0, "update": 0, "schema": 0}
+
+        self.fields = fields
+        self.value_size = value_size
+        self.load(objects)
+
+    def load(self, objects):
+        """Replace the repository content with the given number of objects"""
+        field_names = ["status"] + [f"field{idx}" for idx in range(1, self.fields)]
+        repository = {}
+        for idx in range(objects):
+            object_id = str(100000 + idx)
+            properties = {
+                name: {"value": self._random_value(self.value_size)} for name in field_names
+            }
+            properties["status"] = {"value": "done" if idx % 2 else "open"}
+            repository[object_id] = properties
+
+        with self.lock:
+            self.field_names = field_names
+            self.objects = repository
+            self.object_ids = list(repository)
+            self.calls = dict.fromkeys(self.calls, 0)
+
+    def _random_value(self, size):
+        return "".join(self.random.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(size))
+
+    def _simulate(self, endpoint):
+        """Count the call, sleep for the configured latency and maybe fail"""
+        with self.lock:
+            self.calls[endpoint] += 1
+            failed = self.error_rate and self.random.random() < self.error_rate
+            delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        if failed:
+            return {"error": "simulated failure"}, 503
+        return None
+
+    def _object(self, object_id, field_names=None):
+        properties = self.objects[object_id]
+        selected = {
+            name: value for name, value in properties.items()
+            if field_names is None or name in field_names
+        }
+        selected["system:objectId"] = {"value": object_id}
+        selected["system:objectTypeId"] = {"value": OBJECT_TYPE_ID}
+        return {"properties": selected}
+
+    def create_app(self):
+        """Flask app serving the fake endpoints"""
+        app = Flask(__name__)
+
+        @app.get("/dms/info")
+        def info():
+            return self._simulate("info") or {"version": "fake", "objects": len(self.objects)}
+
+        @app.post("/api/dms/objects/search")
+        def search():
+            failure = self._simulate("search")
+            if failure:
+                return failure
+
+            query = request.get_json()["query"]
+            statement = query["statement"]
+            skip_count = query.get("skipCount", 0)
+            max_items = query.get("maxItems", 10)
+
+            select_clause = re.match(r"SELECT (.*?) FROM", statement).group(1)
+            field_names = None if select_clause.strip() == "*" else {
+                name.strip() for name in select_clause.split(",")
+            }
+            id_match = re.search(r"IN \((.*)\)", statement)
+            if id_match:
+                object_ids = [
+                    object_id.strip().strip("'") for object_id in id_match.group(1).split(",")
+                ]
+                object_ids = [object_id for object_id in object_ids if object_id in self.objects]
+            else:
+                object_ids = self.object_ids
+
+            page = object_ids[skip_count:skip_count + max_items]
+            return {
+                "objects": [self._object(object_id, field_names) for object_id in page],
+                "numItems": len(page),
+                "hasMoreItems": skip_count + len(page) < len(object_ids),
+                "totalNumItems": len(object_ids)
+            }
+
+        @app.get("/api/dms/objects/<object_id>")
+        def object_get(object_id):
+            failure = self._simulate("object_get")
+            if failure:
+                return failure
+            if object_id not in self.objects:
+                return {"error": "not found"}, 404
+            return {"objects": [self._object(object_id)]}
+
+        @app.post("/api/dms/objects")
+        def update():
+            failure = self._simulate("update")
+            if failure:
+                return failure
+
+            updated = []
+            for dms_object in request.get_json()["objects"]:
+                properties = dms_object["properties"]
+                object_id = properties["system:objectId"]["value"]
+                if object_id not in self.objects:
+                    return {"error": f"object {object_id} not found"}, 404
+                for name, value in properties.items():
+                    if not name.startswith("system:"):
+                        self.objects[object_id][name] = value
+                updated.append({"properties": {"system:objectId": {"value": object_id}}})
+            return {"objects": updated}
+
+        @app.get("/api/dms/schema")
+        def schema():
+            return self._simulate("schema") or {
+                "objectTypes": [
+                    {"id": OBJECT_TYPE_ID, "localName": OBJECT_TYPE_NAME, "displayName": "Benchmark Folder"}
+                ]
+            }
+
+        @app.get("/api/dms/schema/objecttype/<objecttype_id>")
+        def object_schema(objecttype_id):
+            failure = self._simulate("schema")
+            if failure:
+                return failure
+            if objecttype_id != OBJECT_TYPE_ID:
+                return {"error": "unknown object type"}, 404
+            return {
+                "id": OBJECT_TYPE_ID,
+                "localName": OBJECT_TYPE_NAME,
+                "displayName": "Benchmark Folder",
+                "baseId": "FOLDER",
+                "allowedChildObjectTypeIds": [],
+                "fields": [
+                    {"localName": name, "displayName": name.title(), "propertyType": "string"}
+                    for name in self.field_names
+                ]
+            }
+
+        return app
+
+
+def serve(fake_dms, host="127.0.0.1", port=0):
+    """
+    Serve the fake DMS from a background thread.
+
+    Returns:
+        werkzeug server, its bound port is server.server_port
+    """
+    server = make_server(host, port, fake_dms.create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--objects", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--fields", type=int, default=5)
+    parser.add_argument("--value-size", type=int, default=16)
+    args = parser.parse_args()
+
+    fake_dms = FakeDMS(
+        objects=args.objects, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, fields=args.fields, value_size=args.value_size
+    )
+    fake_dms.create_app().run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
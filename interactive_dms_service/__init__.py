@@ -3,7 +3,17 @@
 import logging
 from flask import Flask
 from .config import Config
+from .client import DMSClient
+from .jobs import JobManager
+from .cache import TTLCache, TaggedLRUCache, SingleFlight
+from .store import ResultStore
+from .saved import SavedSearches
+from .schema_index import SchemaIndex
+from .metrics import Metrics
+from .limiter import AdaptiveLimiter
+from .resilience import RetryPolicy, CircuitBreaker
 from .routes import main
+from .api import api
     
 def create_app():
     """Application factory pattern."""
@@ -13,8 +23,47 @@ def create_app():
     # Initialize configuration
     Config.configure_app(app)
     
+    # Request counters and latency histograms for flask routes and DMS calls
+    metrics = Metrics()
+    metrics.init_app(app)
+    
+    # Shared, pooled client for all DMS calls, throttled by one process-wide limiter,
+    # retrying transient failures and failing fast while the DMS is down
+    app.extensions["dms_client"] = DMSClient.from_config(
+        app.config, metrics=metrics,
+        limiter=AdaptiveLimiter.from_config(app.config),
+        retry_policy=RetryPolicy.from_config(app.config),
+        breaker=CircuitBreaker.from_config(app.config)
+    )
+    
+    # Identical read-only DMS calls running at the same time share one upstream request
+    app.extensions["dms_singleflight"] = SingleFlight(metrics=metrics)
+    
+    # Cache for the large and rarely changing schema responses
+    app.extensions["dms_schema_cache"] = TTLCache(
+        maxsize=app.config["SCHEMA_CACHE_SIZE"], ttl=app.config["SCHEMA_CACHE_TTL"]
+    )
+    
+    # Object types and fields for local validation and autocomplete
+    app.extensions["dms_schema_index"] = SchemaIndex.from_config(app)
+    
+    # Short-lived cache for search result pages, disabled with SEARCH_CACHE_TTL=0
+    app.extensions["dms_search_cache"] = TaggedLRUCache(
+        max_bytes=app.config["SEARCH_CACHE_MAX_MB"] * 1024 * 1024, ttl=app.config["SEARCH_CACHE_TTL"]
+    ) if app.config["SEARCH_CACHE_TTL"] > 0 else None
+    
+    # Server-side store for result sets, sessions only keep their ids
+    app.extensions["dms_results"] = ResultStore.from_config(app.config)
+    
+    # Saved searches keep their result sets and refresh them incrementally
+    app.extensions["dms_saved_searches"] = SavedSearches.from_config(app.config)
+    
+    # Background worker pool for dry runs and updates
+    app.extensions["dms_jobs"] = JobManager.from_config(app)
+    
     # Register blueprints
     app.register_blueprint(main)
+    app.register_blueprint(api)
     
     # Configure logging for the app
     logger = logging.getLogger(__name__)
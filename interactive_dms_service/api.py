@@ -0,0 +1,245 @@
+"""Versioned JSON API for scripted search, dry run and update"""
+
+import json
+import logging
+from flask import Blueprint, Response, current_app, request, stream_with_context, url_for
+from .dmsapi import call_search, iter_search, call_dryrun
+from .export import object_row, export_lines, prefetch_pages, gzip_chunks
+from .jobs import get_jobs
+from .schema_index import get_schema_index
+from .store import get_store
+from .tasks import run_search, run_dryrun, create_update_journal, run_update
+
+# Create blueprint, no forms and no session: every request carries its own state
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+logger = logging.getLogger(__name__)
+
+
+def _json_body(*required):
+    """
+    JSON object of the request body and an error response if it is invalid.
+
+    Returns:
+        tuple: (body, None) or (None, (error dict, status))
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return None, ({'error': "Request body must be a JSON object"}, 400)
+    missing = [key for key in required if not str(body.get(key, '')).strip()]
+    if missing:
+        return None, ({'error': f"Missing {', '.join(missing)}"}, 400)
+    return body, None
+
+
+def _page_size(body):
+    """Page size of the request body, clamped to PAGE_SIZE_MAX, ValueError if not a number"""
+    try:
+        size = int(body.get('size', current_app.config['PAGE_SIZE']))
+    except (TypeError, ValueError):
+        raise ValueError("size must be an integer") from None
+    return max(1, min(size, current_app.config['PAGE_SIZE_MAX']))
+
+
+def _ndjson(chunks):
+    """Streaming NDJSON response, gzip compressed if the client accepts it"""
+    headers = {'Vary': 'Accept-Encoding'}
+    if 'gzip' in request.accept_encodings:
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    return Response(stream_with_context(chunks), mimetype='application/x-ndjson', headers=headers)
+
+
+def _job_response(job):
+    """Accepted response for a submitted job with the URL to poll"""
+    job_data = job.to_dict()
+    job_data['status_url'] = url_for('api.job_status', job_id=job.id)
+    return job_data, 202, {'Location': job_data['status_url']}
+
+
+@api.route('/search', methods=['POST'])
+def search():
+    """
+    Search the DMS: {"folder", "field", "condition", "page", "size"}.
+
+    Returns one page as JSON. With "stream": true all pages are streamed
+    as NDJSON, one object per line, straight from the DMS. If a later page
+    fails, the stream ends with a line {"error": ...}.
+    """
+
+    body, error = _json_body('folder')
+    if error:
+        return error
+
+    folder = str(body['folder']).strip()
+    field = str(body.get('field', '*')).strip() or '*'
+    condition = str(body.get('condition', '*')).strip() or '*'
+
+    if body.get('stream'):
+        logger.info("API search %s for %s items with %s streamed", field, folder, condition)
+        errors = []
+        pages = prefetch_pages(iter_search(field, folder, condition, errors=errors), errors)
+        if pages is None:
+            return {'error': errors[0]}, 502
+
+        def lines():
+            yield from export_lines(pages, 'ndjson')
+            if errors:
+                logger.error("API search stream of %s items ended early: %s", folder, errors[0])
+                yield json.dumps({'error': errors[0]}) + '\n'
+
+        return _ndjson(lines())
+
+    try:
+        page = max(1, int(body.get('page', 1)))
+        size = _page_size(body)
+    except (TypeError, ValueError):
+        return {'error': "page and size must be integers"}, 400
+
+    search_results = call_search(field, folder, condition, (page - 1) * size, size)
+    if "error" in search_results:
+        return {'error': search_results['error']}, 502
+
+    return {
+        'page': page,
+        'size': size,
+        'total': search_results.get('totalNumItems'),
+        'has_more': bool(search_results.get('hasMoreItems')),
+        'objects': [object_row(dms_object) for dms_object in search_results.get('objects', [])]
+    }
+
+
+@api.route('/results', methods=['POST'])
+def results_create():
+    """Store all objects of a search as result set for a dry run: {"folder", "field", "condition"}"""
+
+    body, error = _json_body('folder')
+    if error:
+        return error
+
+    search_data = run_search(
+        str(body['folder']).strip(),
+        str(body.get('field', '*')).strip() or '*',
+        str(body.get('condition', '*')).strip() or '*'
+    )
+    if search_data['result_id'] is None:
+        return {'error': "Search found no objects", 'count': 0}, 404
+
+    search_data['rows_url'] = url_for('api.results_rows', set_id=search_data['result_id'])
+    return search_data, 201
+
+
+@api.route('/results/<set_id>')
+def results_rows(set_id):
+    """Rows of a stored result set as NDJSON, sliced with ?offset=...&limit=..."""
+
+    store = get_store()
+    if not store.exists(set_id):
+        return {'error': f"Result set {set_id} not found"}, 404
+
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = request.args.get('limit', type=int)
+
+    def lines():
+        for row in store.iter_rows(set_id, offset, limit):
+            yield json.dumps(row) + '\n'
+
+    return _ndjson(lines())
+
+
+@api.route('/dryrun', methods=['POST'])
+def dryrun():
+    """
+    Dry run over a stored search: {"result_id", "field", "new_value"}.
+
+    Submits a background job, its result holds the ids of the preview and
+    payloads result sets. With "preview": true the first "size" objects are
+    looked up synchronously and returned without preparing payloads.
+    """
+
+    body, error = _json_body('result_id', 'field')
+    if error:
+        return error
+
+    store = get_store()
+    result_id = str(body['result_id'])
+    field = str(body['field']).strip()
+    # null clears the field like an empty form input, other JSON types would be written as their repr
+    new_value = body.get('new_value')
+    if new_value is None:
+        new_value = ''
+    if not isinstance(new_value, str):
+        return {'error': "new_value must be a string or null"}, 400
+    if not store.exists(result_id):
+        return {'error': f"Result set {result_id} not found"}, 404
+
+    # reject unknown object types and fields before a job is submitted
+    object_type = store.get_meta(result_id).get('folder')
+    if object_type:
+        schema_error = get_schema_index().check(object_type, [field])
+        if schema_error:
+            return {'error': schema_error}, 400
+
+    update_string = f"Updating {field} to {new_value}"
+
+    if body.get('preview'):
+        try:
+            size = _page_size(body)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        dryrun_data = call_dryrun(
+            list(store.iter_rows(result_id, 0, size)), field, new_value, object_type=object_type
+        )
+        if "error" in dryrun_data:
+            return {'error': dryrun_data['error']}, 400
+        return {'summary': dryrun_data['summary'], 'dryrun': dryrun_data['result_dryrun']}
+
+    job = get_jobs().submit(
+        'dryrun', run_dryrun, result_id, field, new_value,
+        total=store.count(result_id), description=update_string
+    )
+    logger.info("API dry run '%s' submitted as job %s", update_string, job.id)
+
+    return _job_response(job)
+
+
+@api.route('/update', methods=['POST'])
+def update():
+    """Execute the payloads of a finished dry run: {"payloads_id"}, submitted as background job"""
+
+    body, error = _json_body('payloads_id')
+    if error:
+        return error
+
+    store = get_store()
+    payloads_id = str(body['payloads_id'])
+    if not store.exists(payloads_id):
+        return {'error': f"Payloads {payloads_id} not found"}, 404
+
+    no_of_payloads = store.count(payloads_id)
+    if not no_of_payloads:
+        return {'error': "Dry run found no objects to change"}, 409
+
+    journal = create_update_journal(payloads_id)
+    job = get_jobs().submit(
+        'update', run_update, payloads_id, run_id=journal.run_id, total=no_of_payloads,
+        description=f"Updating {no_of_payloads} objects (run {journal.run_id})", key=f"run:{journal.run_id}"
+    )
+    logger.info("API update of %i objects submitted as job %s", no_of_payloads, job.id)
+
+    return _job_response(job)
+
+
+@api.route('/jobs/<job_id>', methods=['GET', 'DELETE'])
+def job_status(job_id):
+    """Status of a background job with its result once finished, DELETE cancels the job"""
+
+    job = get_jobs().get(job_id)
+    if not job:
+        return {'error': f"Job {job_id} not found"}, 404
+
+    if request.method == 'DELETE':
+        get_jobs().cancel(job_id)
+
+    job_data = job.to_dict()
+    job_data['result'] = job.result if job.status == 'finished' else None
+    return job_data
@@ -0,0 +1,214 @@
+"""In-process caches for DMS responses"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheEntry:
+    """Cached value with expiry time and HTTP validators"""
+
+    def __init__(self, value, ttl, etag=None, last_modified=None):
+        self.value = value
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = time.monotonic() + ttl
+
+    @property
+    def is_fresh(self):
+        """True until the TTL has passed"""
+        return time.monotonic() < self.expires
+
+
+class TTLCache:
+    """
+    Thread-safe cache with TTL and size-bounded LRU eviction.
+
+    Stale entries are kept until evicted, so callers can revalidate them
+    with their ETag/Last-Modified instead of downloading them again.
+    """
+
+    def __init__(self, maxsize=256, ttl=600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the entry for key (fresh or stale) or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value, etag=None, last_modified=None):
+        """Store value for key, evicting the least recently used entries"""
+        with self._lock:
+            self._entries[key] = CacheEntry(value, self.ttl, etag, last_modified)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def refresh(self, key):
+        """Restart the TTL of an entry after a successful revalidation"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires = time.monotonic() + self.ttl
+
+    def invalidate(self, key=None):
+        """Drop one entry or, without key, the whole cache. Returns the number of dropped entries"""
+        with self._lock:
+            if key is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                return dropped
+            return 1 if self._entries.pop(key, None) is not None else 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class TaggedLRUCache:
+    """
+    Thread-safe cache with TTL, a byte budget and LRU eviction.
+
+    Every entry carries its size in bytes and a set of tags. Least recently
+    used entries are evicted until the total size fits max_bytes, expired
+    entries are dropped on access. invalidate_tags drops every entry carrying
+    one of the given tags, e.g. the ids of objects that were just written.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=30):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._lock = threading.Lock()
+
+    def _remove(self, key):
+        """Drop an entry and its tag references, caller holds the lock"""
+        _, size, _, tags = self._entries.pop(key)
+        self.size -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key):
+        """Return the fresh value for key or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() >= entry[2]:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, size, tags=()):
+        """Store value for key, evicting least recently used entries beyond max_bytes"""
+        if size > self.max_bytes:
+            return
+        tags = frozenset(tags)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl, tags)
+            self.size += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_tags(self, tags):
+        """Drop all entries carrying one of tags. Returns the number of dropped entries"""
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys.update(self._tags.get(tag, ()))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def invalidate(self):
+        """Drop the whole cache. Returns the number of dropped entries"""
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+            self._tags.clear()
+            self.size = 0
+            return dropped
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class _Flight:
+    """A call in progress, shared by all callers with the same key"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls.
+
+    The first caller of a key runs the function, callers arriving with the same
+    key while it is in flight wait for it and get the same result (or exception).
+    Nothing is kept after the call completes, so this is no cache: the next
+    caller starts a new call. Shared results must not be modified by callers.
+    """
+
+    def __init__(self, metrics=None):
+        self.metrics = metrics
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Return func(*args, **kwargs), sharing one call per key among concurrent callers.
+
+        key is a hashable tuple starting with the endpoint name, e.g. ('search', payload_json).
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.waiters += 1
+
+        if not leader:
+            if self.metrics is not None:
+                self.metrics.inc("dms_coalesced_total", {"endpoint": key[0]})
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func(*args, **kwargs)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._flights)
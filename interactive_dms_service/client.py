@@ -0,0 +1,167 @@
+"""Shared HTTP client for the enaio DMS Service API"""
+
+import logging
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from .resilience import CircuitOpenError
+
+
+class DMSClient:
+    """
+    App-scoped client for all calls to the DMS.
+
+    Holds one requests.Session with a pooled HTTPAdapter, so connections to the
+    enaio host are kept alive and reused across requests and worker threads.
+    Every request passes the optional CircuitBreaker and AdaptiveLimiter and is
+    recorded in the optional Metrics registry. Idempotent requests are retried
+    according to the optional RetryPolicy.
+    """
+
+    def __init__(self, api_host, api_auth, pool_connections=10, pool_maxsize=10,
+                 connect_timeout=10, read_timeout=30, headers=None, metrics=None, limiter=None,
+                 retry_policy=None, breaker=None):
+        self.base_url = f"http://{api_host}"
+        self.timeout = (connect_timeout, read_timeout)
+        self.proxies = {"http": None, "https": None}
+        self.metrics = metrics
+        self.limiter = limiter
+        self.retry_policy = retry_policy
+        self.breaker = breaker
+
+        self.session = requests.Session()
+        self.session.headers.update({"authorization": api_auth})
+        if headers:
+            self.session.headers.update(headers)
+
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        logger = logging.getLogger(__name__)
+        logger.info("DMS client for %s created (pool size %d)", self.base_url, pool_maxsize)
+
+    @classmethod
+    def from_config(cls, config, metrics=None, limiter=None, retry_policy=None, breaker=None):
+        """
+        Create a client from the flask app configuration.
+
+        The pool keeps at least one connection per dry run worker of every job
+        worker, otherwise connections beyond DMS_POOL_MAXSIZE are opened and
+        discarded for each request.
+        """
+        logger = logging.getLogger(__name__)
+
+        pool_maxsize = config["DMS_POOL_MAXSIZE"]
+        required = config["DRYRUN_WORKERS"] * config["JOB_WORKERS"]
+        if pool_maxsize < required:
+            logger.warning(
+                "DMS_POOL_MAXSIZE %d is below DRYRUN_WORKERS x JOB_WORKERS, using a pool size of %d",
+                pool_maxsize, required
+            )
+            pool_maxsize = required
+
+        return cls(
+            api_host=config["API_HOST"],
+            api_auth=config["API_AUTH"],
+            pool_connections=config["DMS_POOL_CONNECTIONS"],
+            pool_maxsize=pool_maxsize,
+            connect_timeout=config["DMS_CONNECT_TIMEOUT"],
+            read_timeout=config["DMS_READ_TIMEOUT"],
+            headers=config["DMS_EXTRA_HEADERS"],
+            metrics=metrics,
+            limiter=limiter,
+            retry_policy=retry_policy,
+            breaker=breaker,
+        )
+
+    def url(self, path):
+        """Absolute URL for an API path"""
+        return f"{self.base_url}{path}"
+
+    def request(self, method, path, endpoint="other", idempotent=None, **kwargs):
+        """
+        Send a request through the pooled session.
+
+        endpoint is the metrics label of the call, e.g. 'search' or 'object_get'.
+        Transient failures are retried with backoff if the request is idempotent,
+        which defaults to True for GET requests only. A 429 is retried for every
+        request, the DMS refused it without processing it.
+        """
+        logger = logging.getLogger(__name__)
+
+        kwargs.setdefault("timeout", self.timeout)
+        kwargs.setdefault("proxies", self.proxies)
+        if idempotent is None:
+            idempotent = method == "GET"
+
+        attempt = 0
+        while True:
+            attempt += 1
+            response = None
+            try:
+                response = self._send(method, path, endpoint, **kwargs)
+            except requests.exceptions.RequestException as e:
+                if not (idempotent and self.retry_policy and self.retry_policy.should_retry(attempt, error=e)):
+                    raise
+                delay = self.retry_policy.delay(attempt)
+                logger.warning("%s %s failed (%s), retry %d in %.2f s", method, path, e, attempt, delay)
+            else:
+                retryable = idempotent or response.status_code == 429
+                if not (retryable and self.retry_policy and self.retry_policy.should_retry(attempt, response=response)):
+                    return response
+                delay = self.retry_policy.delay(attempt, response)
+                logger.warning(
+                    "%s %s returned %d, retry %d in %.2f s", method, path, response.status_code, attempt, delay
+                )
+                response.close()
+            time.sleep(delay)
+
+    def _send(self, method, path, endpoint, **kwargs):
+        """Send a single attempt through breaker, limiter and metrics"""
+        if self.breaker is not None:
+            try:
+                self.breaker.before_request()
+            except CircuitOpenError:
+                if self.metrics is not None:
+                    self.metrics.inc("dms_errors_total", {"endpoint": endpoint, "type": "CircuitOpenError"})
+                raise
+
+        if self.limiter is not None:
+            self.limiter.acquire()
+
+        started = time.perf_counter()
+        status_code = None
+        error_type = None
+        try:
+            response = self.session.request(method, self.url(path), **kwargs)
+            status_code = response.status_code
+            if response.status_code >= 400:
+                error_type = f"http_{response.status_code}"
+            return response
+        except requests.exceptions.RequestException as e:
+            error_type = type(e).__name__
+            raise
+        finally:
+            latency = time.perf_counter() - started
+            if self.breaker is not None:
+                if status_code is None or status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+            if self.limiter is not None:
+                self.limiter.release(latency, status_code)
+            if self.metrics is not None:
+                self.metrics.track_dms_call(endpoint, latency, error_type)
+
+    def get(self, path, **kwargs):
+        """Send a GET request"""
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        """Send a POST request"""
+        return self.request("POST", path, **kwargs)
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
@@ -1,15 +1,23 @@
 """Configure flask app """
 
 import os
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
 from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
 from flask_session import Session
+from .sessions import SQLiteSessionInterface
 
 # Load environment variables
 load_dotenv()
 
+# background thread writing the queued log records, see Config.configure_app
+_log_listener = None
+
 class Config:
     """Application configuration class."""
 
@@ -21,10 +29,57 @@ class Config:
     LOG_DIRECTORY = os.getenv('LOG_DIRECTORY', 'logs')
     LOG_LEVEL = getattr(logging, os.getenv('LOG_LEVEL', 'ERROR').upper())
     LOG_FILE = os.getenv('LOG_FILE', 'default.log')
+    LOG_OBJECT_SAMPLE_EVERY = int(os.getenv('LOG_OBJECT_SAMPLE_EVERY', '100'))
     
     API_HOST = os.getenv('API_HOST', 'https://127.0.0.1')
     API_AUTH = os.getenv('API_AUTH', '')
     
+    # JSON object of additional headers sent with every DMS request, e.g. {"X-Tenant": "a"}
+    DMS_EXTRA_HEADERS = json.loads(os.getenv('DMS_EXTRA_HEADERS', '') or '{}')
+    DMS_POOL_CONNECTIONS = int(os.getenv('DMS_POOL_CONNECTIONS', '10'))
+    DMS_POOL_MAXSIZE = int(os.getenv('DMS_POOL_MAXSIZE', '16'))
+    DMS_CONNECT_TIMEOUT = float(os.getenv('DMS_CONNECT_TIMEOUT', '10'))
+    DMS_READ_TIMEOUT = float(os.getenv('DMS_READ_TIMEOUT', '30'))
+    DMS_MAX_IN_FLIGHT = int(os.getenv('DMS_MAX_IN_FLIGHT', '16'))
+    DMS_MIN_IN_FLIGHT = int(os.getenv('DMS_MIN_IN_FLIGHT', '1'))
+    DMS_MAX_RPS = float(os.getenv('DMS_MAX_RPS', '0'))
+    DMS_LATENCY_TARGET_MS = float(os.getenv('DMS_LATENCY_TARGET_MS', '2000'))
+    DMS_RETRY_ATTEMPTS = int(os.getenv('DMS_RETRY_ATTEMPTS', '3'))
+    DMS_RETRY_BACKOFF_MS = float(os.getenv('DMS_RETRY_BACKOFF_MS', '500'))
+    DMS_RETRY_BACKOFF_MAX_MS = float(os.getenv('DMS_RETRY_BACKOFF_MAX_MS', '10000'))
+    DMS_RETRY_UPDATES = os.getenv('DMS_RETRY_UPDATES', 'False').lower() == 'true'
+    DMS_BREAKER_THRESHOLD = int(os.getenv('DMS_BREAKER_THRESHOLD', '5'))
+    DMS_BREAKER_RESET_SECONDS = float(os.getenv('DMS_BREAKER_RESET_SECONDS', '30'))
+    
+    SEARCH_PAGE_SIZE = int(os.getenv('SEARCH_PAGE_SIZE', '500'))
+    SEARCH_MAX_ITEMS = int(os.getenv('SEARCH_MAX_ITEMS', '0'))
+    SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', '30'))
+    SEARCH_CACHE_MAX_MB = int(os.getenv('SEARCH_CACHE_MAX_MB', '64'))
+    
+    PAGE_SIZE = int(os.getenv('PAGE_SIZE', '100'))
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', '1000'))
+    
+    DRYRUN_WORKERS = int(os.getenv('DRYRUN_WORKERS', '8'))
+    DRYRUN_LOOKUP = os.getenv('DRYRUN_LOOKUP', 'search')
+    DRYRUN_LOOKUP_CHUNK = int(os.getenv('DRYRUN_LOOKUP_CHUNK', '100'))
+    UPDATE_CHUNK_SIZE = int(os.getenv('UPDATE_CHUNK_SIZE', '50'))
+    UPDATE_JOURNAL_DIR = os.getenv('UPDATE_JOURNAL_DIR', 'update_journal')
+    
+    UPLOAD_DIR = os.getenv('UPLOAD_DIR', 'uploads')
+    UPLOAD_CHUNK_ROWS = int(os.getenv('UPLOAD_CHUNK_ROWS', '1000'))
+    UPLOAD_MAX_MB = int(os.getenv('UPLOAD_MAX_MB', '100'))
+    MAX_CONTENT_LENGTH = UPLOAD_MAX_MB * 1024 * 1024
+    
+    SCHEMA_CACHE_TTL = int(os.getenv('SCHEMA_CACHE_TTL', '600'))
+    SCHEMA_CACHE_SIZE = int(os.getenv('SCHEMA_CACHE_SIZE', '256'))
+    SCHEMA_INDEX_REFRESH_SECONDS = int(os.getenv('SCHEMA_INDEX_REFRESH_SECONDS', '900'))
+    
+    RESULT_STORE_PATH = os.getenv('RESULT_STORE_PATH', 'result_store/results.sqlite3')
+    RESULT_STORE_TTL_MINUTES = int(os.getenv('RESULT_STORE_TTL_MINUTES', '120'))
+    
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+    JOB_RETENTION_MINUTES = int(os.getenv('JOB_RETENTION_MINUTES', '60'))
+    
     SESSION_TYPE = os.getenv('SESSION_TYPE', 'filesystem')
     SESSION_FILE_DIR = os.getenv('SESSION_FILE_DIR', 'flask_session')
     SESSION_PERMANENT = os.getenv('SESSION_PERMANENT', 'True').lower() == 'true'
@@ -33,6 +88,9 @@ class Config:
     SESSION_LIFETIME_MINUTES = int(os.getenv('SESSION_LIFETIME_MINUTES', '30'))
     PERMANENT_SESSION_LIFETIME = timedelta(minutes=SESSION_LIFETIME_MINUTES)    
     SESSION_FILE_THRESHOLD = int(os.getenv('SESSION_FILE_THRESHOLD', '500'))
+    SESSION_SQLITE_PATH = os.getenv('SESSION_SQLITE_PATH', 'flask_session/sessions.sqlite3')
+    SESSION_CLEANUP_SECONDS = int(os.getenv('SESSION_CLEANUP_SECONDS', '300'))
+    SESSION_CLEANUP_BATCH = int(os.getenv('SESSION_CLEANUP_BATCH', '500'))
     SESSION_COOKIE_SECURE = os.getenv('SESSION_COOKIE_SECURE', 'False').lower() == 'true'
     SESSION_COOKIE_HTTPONLY = os.getenv('SESSION_COOKIE_HTTPONLY', 'True').lower() == 'true'
     SESSION_COOKIE_SAMESITE = os.getenv('SESSION_COOKIE_SAMESITE', 'Lax')
@@ -43,23 +101,35 @@ class Config:
 
         app.config.from_object(Config) # pass Config to the application
 
-        # Initialize Flask-Session
+        # Initialize Flask-Session, SESSION_TYPE=sqlite uses the local SQLite interface
         session_dir = Path(Config.SESSION_FILE_DIR)
         session_dir.mkdir(exist_ok=True, mode=0o700)        
-        Session(app)
+        if Config.SESSION_TYPE == 'sqlite':
+            app.session_interface = SQLiteSessionInterface.from_config(app)
+        else:
+            Session(app)
                 
-        # set up logging
+        # set up logging: request threads only put records on a queue,
+        # a listener thread writes them to the file and the console
+        global _log_listener
         log_dir = Path(Config.LOG_DIRECTORY)
         log_dir.mkdir(exist_ok=True)
         log_file_path = log_dir / Config.LOG_FILE
-        logging.basicConfig(
-            level=Config.LOG_LEVEL,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file_path),
-                logging.StreamHandler()
-            ]
-        )
+        if _log_listener is None:
+            log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            log_handlers = [logging.FileHandler(log_file_path), logging.StreamHandler()]
+            for log_handler in log_handlers:
+                log_handler.setFormatter(log_formatter)
+
+            log_queue = queue.SimpleQueue()
+            _log_listener = logging.handlers.QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+            _log_listener.start()
+            atexit.register(_log_listener.stop)
+
+            # the queue handler only merges message and args, the listener handlers do the formatting
+            queue_handler = logging.handlers.QueueHandler(log_queue)
+            queue_handler.setFormatter(logging.Formatter('%(message)s'))
+            logging.basicConfig(level=Config.LOG_LEVEL, handlers=[queue_handler])
                 
         logger = logging.getLogger(__name__)
         logger.info("Application configuration initialized successfully")
@@ -1,132 +1,527 @@
 """Collection of API calls"""
 
+import json
 import logging
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 import requests
 from flask import current_app
+from .sampling import LogSampler
+
+# statuses of an update the DMS answers for the payload, a smaller chunk may pass
+PAYLOAD_REJECTED_STATUS_CODES = (400, 404, 409, 422)
+
+
+def get_client():
+    """Return the app-scoped DMSClient created in create_app"""
+    return current_app.extensions["dms_client"]
+
+
+def _coalesced(key, func, *args):
+    """Run a read-only call through the app-scoped SingleFlight, see cache.SingleFlight"""
+    return current_app.extensions["dms_singleflight"].do(key, func, *args)
+
+
+def _get_json(client, api_path, endpoint, **kwargs):
+    """GET api_path and return the decoded response, raising on HTTP errors"""
+    logger = logging.getLogger(__name__)
+
+    response = client.get(api_path, endpoint=endpoint, **kwargs)
+    logger.debug("HTTP Response Status: %s Text: %s", response.status_code, response.text)
+    response.raise_for_status()
+    return response.json()
+
+
+def _normalize_statement(statement):
+    """Collapse whitespace outside of quoted literals, so equivalent statements share a cache key"""
+    parts = re.split(r"""('(?:[^']|'')*'|"[^"]*")""", statement.strip())
+    return "".join(
+        part if part[:1] in ("'", '"') else re.sub(r"\s+", " ", part)
+        for part in parts
+    )
+
+
+def _search_page(client, api_path, payload, cache_key):
+    """POST a search and store the decoded page in the search cache, tagged with its object ids
+
+    With cache_key None the page is returned without being stored.
+    """
+    response = client.post(api_path, json=payload, endpoint="search", idempotent=True)
+    response.raise_for_status()
+    response_data = response.json()
+
+    cache = current_app.extensions["dms_search_cache"]
+    if cache is not None and cache_key is not None:
+        object_ids = {
+            str(dms_object.get("properties", {}).get("system:objectId", {}).get("value"))
+            for dms_object in response_data.get("objects", [])
+        }
+        cache.set(cache_key, response_data, len(response.content), tags=object_ids)
+    return response_data
+
 
 def call_info():
     """Function for checking API accessability"""
 
     logger = logging.getLogger(__name__)
     
-    api_host = current_app.config["API_HOST"]
-    api_auth = current_app.config["API_AUTH"]    
-    api_endpoint = f"http://{api_host}/dms/info"
-    api_headers = {"authorization": api_auth}
-    call_proxies = {"http": None, "https": None}
+    client = get_client()
+    api_path = "/dms/info"
 
-    logger.info("Calling endpoint %s", api_endpoint)
+    logger.info("Calling endpoint %s", client.url(api_path))
     
     try:
-        response = requests.get(api_endpoint, headers=api_headers, timeout=30, proxies=call_proxies)
-        logger.debug("HTTP Response Status: %s Text: %s", response.status_code, response.text)
-        response.raise_for_status()
-        logger.debug("Info request completed with status %s", response.status_code)        
-        return response.json()
+        response_data = _coalesced(("info",), _get_json, client, api_path, "info")
+        logger.debug("Info request completed")        
+        return response_data
     except requests.exceptions.RequestException as e:
         logger.error("Error calling info endpoint: %s", e)
         return {"error": str(e)}
 
 
-def call_search(qry_field, qry_folder, qry_condition):
-    """Function for sending search querys to enaio"""
+def call_search(qry_field, qry_folder, qry_condition, skip_count=0, max_items=10, use_cache=True):
+    """Function for sending search querys to enaio
+
+    Returns a single result page starting at skip_count with up to max_items objects.
+    Use iter_search to walk through all pages of a query.
+
+    Pages are kept in the optional search cache for SEARCH_CACHE_TTL seconds, keyed
+    on the normalized statement and the paging window. With use_cache=False the
+    page is always requested from the DMS and not stored, so one-off lookups do
+    not evict the pages of interactive searches.
+    """
     
     logger = logging.getLogger(__name__)
     
-    api_host = current_app.config["API_HOST"]
-    api_auth = current_app.config["API_AUTH"]    
-    api_endpoint = f"http://{api_host}/api/dms/objects/search"
-    api_headers = {
-        "authorization": api_auth, 
-        "content-type": "application/json"
-        }
-    call_proxies = {"http": None, "https": None}
+    client = get_client()
+    api_path = "/api/dms/objects/search"
     
-    logger.info("Calling endpoint %s", api_endpoint)
+    logger.info("Calling endpoint %s", client.url(api_path))
 
     payload = {
         "query": {
             "statement": f"SELECT {qry_field} FROM {qry_folder} WHERE {qry_condition}",
-            "skipCount": 0,
-            "maxItems": 10,
+            "skipCount": skip_count,
+            "maxItems": max_items,
             "handleDeletedDocuments": "DELETED_DOCUMENTS_EXCLUDE"
             }
         }
     
     logger.debug("Search Query Payload: %s", payload)
 
+    cache_key = (_normalize_statement(payload["query"]["statement"]), skip_count, max_items)
+    cache = current_app.extensions["dms_search_cache"]
+    if use_cache and cache is not None:
+        response_data = cache.get(cache_key)
+        if response_data is not None:
+            logger.debug("Search cache hit for %s", cache_key)
+            return response_data
+
     try:
-        response = requests.post(api_endpoint, json=payload, headers=api_headers, timeout=30,  proxies=call_proxies)
-        response.raise_for_status()
-        logger.debug("Search request completed with status %s", response.status_code)
-        return response.json()
+        response_data = _coalesced(
+            ("search", json.dumps(payload, sort_keys=True), use_cache),
+            _search_page, client, api_path, payload, cache_key if use_cache else None
+        )
+        logger.debug("Search request completed")
+        return response_data
     except requests.exceptions.RequestException as e:
         logger.error("Error calling search endpoint: %s", e)
         return {"error": str(e)}
 
 
+def iter_search(qry_field, qry_folder, qry_condition, page_size=None, max_items=None,
+                use_cache=True, errors=None):
+    """
+    Generator walking through all result pages of a search query.
+
+    Requests pages of page_size objects and advances skipCount until the DMS
+    reports no more items. Each yielded page is the list of objects of one response,
+    so callers can process results while the next page is not yet requested.
+
+    Args:
+        qry_field (str): Fields for the SELECT clause
+        qry_folder (str): Internal folder name for the FROM clause
+        qry_condition (str): Contents of the WHERE clause
+        page_size (int): Objects per request, defaults to SEARCH_PAGE_SIZE
+        max_items (int): Optional overall cap, defaults to SEARCH_MAX_ITEMS (0 = no cap)
+        use_cache (bool): Passed to call_search
+        errors (list): Optional list, the error of a failed page request is appended to it
+
+    Yields:
+        list: Objects of one result page
+    """
+    logger = logging.getLogger(__name__)
+
+    if page_size is None:
+        page_size = current_app.config["SEARCH_PAGE_SIZE"]
+    if max_items is None:
+        max_items = current_app.config["SEARCH_MAX_ITEMS"]
+
+    skip_count = 0
+    while True:
+        request_size = page_size
+        if max_items:
+            request_size = min(page_size, max_items - skip_count)
+            if request_size <= 0:
+                logger.info("Search stopped at configured cap of %d items", max_items)
+                return
+
+        search_results = call_search(qry_field, qry_folder, qry_condition, skip_count, request_size, use_cache)
+        if "error" in search_results:
+            # error is already logged by call_search, stop paging here
+            if errors is not None:
+                errors.append(search_results["error"])
+            return
+
+        objects = search_results.get("objects", [])
+        if not objects:
+            return
+
+        skip_count += len(objects)
+        logger.debug("Search page received: %d objects, %d in total", len(objects), skip_count)
+        yield objects
+
+        has_more = search_results.get("hasMoreItems")
+        if has_more is None:
+            has_more = len(objects) >= request_size
+        if not has_more:
+            return
+
+
+def _get_cached(client, api_path):
+    """
+    GET api_path through the app-scoped schema cache.
+
+    Fresh entries are returned without a request. Stale entries are revalidated
+    with If-None-Match/If-Modified-Since if the server sent validators, a 304
+    keeps the cached value. Concurrent misses for the same path share one request.
+    Raises the same exceptions as a plain client call.
+    """
+    logger = logging.getLogger(__name__)
+
+    cache = current_app.extensions["dms_schema_cache"]
+    entry = cache.get(api_path)
+    if entry and entry.is_fresh:
+        logger.debug("Schema cache hit for %s", api_path)
+        return entry.value
+
+    endpoint = "objectschema" if "/objecttype/" in api_path else "schema"
+    return _coalesced((endpoint, api_path), _fetch_cached, client, cache, api_path, endpoint)
+
+
+def _fetch_cached(client, cache, api_path, endpoint):
+    """Load or revalidate the schema cache entry of api_path, see _get_cached"""
+    logger = logging.getLogger(__name__)
+
+    entry = cache.get(api_path)
+
+    api_headers = {}
+    if entry and entry.etag:
+        api_headers["if-none-match"] = entry.etag
+    if entry and entry.last_modified:
+        api_headers["if-modified-since"] = entry.last_modified
+
+    response = client.get(api_path, headers=api_headers, endpoint=endpoint)
+    if response.status_code == 304 and entry:
+        logger.debug("Schema cache entry for %s revalidated", api_path)
+        cache.refresh(api_path)
+        return entry.value
+
+    response.raise_for_status()
+    response_data = response.json()
+    cache.set(
+        api_path, response_data,
+        etag=response.headers.get("etag"),
+        last_modified=response.headers.get("last-modified")
+    )
+    return response_data
+
+
 def call_schema():
-    """Function to get the complete ObjectDefinition schema"""
+    """Function to get the complete ObjectDefinition schema (cached)"""
     logger = logging.getLogger(__name__)
     
-    api_host = current_app.config["API_HOST"]
-    api_auth = current_app.config["API_AUTH"]
-    api_endpoint = f"http://{api_host}/api/dms/schema"
-    api_headers = {"authorization": api_auth}
-    call_proxies = {"http": None, "https": None}
+    client = get_client()
+    api_path = "/api/dms/schema"
 
-    logger.info("Calling endpoint %s", api_endpoint)
+    logger.info("Calling endpoint %s", client.url(api_path))
     
     try:
-        response = requests.get(api_endpoint, headers=api_headers, timeout=30, proxies=call_proxies)
-        response.raise_for_status()
-        logger.debug("Schema request completed with status %s", response.status_code)
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        response_data = _get_cached(client, api_path)
+        logger.debug("Schema request completed")
+        return response_data
+    except (requests.exceptions.RequestException, ValueError) as e:
         logger.error("Error calling schema endpoint: %s", e)
         return {"error": str(e)}
-    
-
 
 
 def call_objectschema(object_id):
-    """Function to get the objectdefinition schema for a specific objectType"""
+    """Function to get the objectdefinition schema for a specific objectType (cached)"""
     logger = logging.getLogger(__name__)
     
-    api_host = current_app.config["API_HOST"]
-    api_auth = current_app.config["API_AUTH"]
-    api_endpoint = f"http://{api_host}/api/dms/schema/objecttype/{object_id}"
-    api_headers = {"authorization": api_auth}
-    call_proxies = {"http": None, "https": None}
+    client = get_client()
+    api_path = f"/api/dms/schema/objecttype/{object_id}"
 
-    logger.info("Calling endpoint %s for object ID %s", api_endpoint, object_id)
+    logger.info("Calling endpoint %s for object ID %s", client.url(api_path), object_id)
     
     try:
-        response = requests.get(api_endpoint, headers=api_headers, timeout=30, proxies=call_proxies)
-        response.raise_for_status()
-        logger.debug("Object schema request completed with status %s", response.status_code)
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        response_data = _get_cached(client, api_path)
+        logger.debug("Object schema request completed")
+        return response_data
+    except (requests.exceptions.RequestException, ValueError) as e:
         logger.error("Error calling object schema endpoint (ID: %s): %s", object_id, e)
         return {"error": str(e)}
 
 
-def call_dryrun(search_results, field_name, new_value):
+def _ordered_map(executor, func, iterable, window):
+    """
+    Map func over iterable in the executor, yielding results in input order.
+
+    At most window calls are submitted ahead of the consumer, so generators
+    are not read into memory up front.
+    """
+    pending = deque()
+    for item in iterable:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _lookup_by_search(object_type, field_name, object_ids):
+    """
+    Read field_name for many objects with a single search request.
+
+    Args:
+        object_type (str): Internal object type name for the FROM clause
+        field_name (str): Field to read
+        object_ids (list): Object ids to look up
+
+    Returns:
+        dict: objectId -> properties, only for objects returned with the field
+    """
+    logger = logging.getLogger(__name__)
+
+    if not object_ids:
+        return {}
+
+    id_list = ", ".join("'" + str(object_id).replace("'", "''") + "'" for object_id in object_ids)
+    # current values must come from the DMS, never from the search cache
+    search_results = call_search(
+        f"{field_name}, system:objectId", object_type, f"system:objectId IN ({id_list})",
+        0, len(object_ids), use_cache=False
+    )
+    if "error" in search_results:
+        logger.warning("Search lookup for %d objects failed, falling back to single requests", len(object_ids))
+        return {}
+
+    found = {}
+    for dms_object in search_results.get("objects", []):
+        properties = dms_object.get("properties", {})
+        object_id = properties.get("system:objectId", {}).get("value")
+        if object_id is not None and field_name in properties:
+            found[str(object_id)] = properties
+
+    logger.debug("Search lookup found %d of %d objects", len(found), len(object_ids))
+    return found
+
+
+def _values_equal(current_value, new_value):
+    """Compare a DMS field value with a new value given as form text"""
+    if current_value is None:
+        current_value = ""
+    if isinstance(current_value, bool):
+        current_value = str(current_value).lower()
+    if isinstance(new_value, bool):
+        new_value = str(new_value).lower()
+    return str(current_value) == str(new_value)
+
+
+def _failed_dryrun_item(object_id, object_type_id, field_name, error_msg):
+    """Dry run row of an object that could not be checked"""
+    return {
+        "object_id": object_id,
+        "object_type_id": object_type_id,
+        "status": "0",
+        "change": "failed",
+        "details": error_msg,
+        "field": field_name,
+        "current_value": "",
+        "new_value": ""
+    }
+
+
+def _dryrun_object(client, dms_object, field_name, new_value, properties_item=None, sampler=None):
+    """
+    Fetch the current value of field_name for a single object.
+
+    If properties_item is given (from a search lookup), no request is sent.
+    Warnings about missing objects and fields go through the optional LogSampler.
+
+    Returns:
+        tuple: (dryrun_item, payload_item), payload_item is None unless the value changes;
+               objects that could not be checked get a dryrun_item with change 'failed'
+    """
+    logger = logging.getLogger(__name__)
+
+    object_id = dms_object.get("objectId")
+    object_type_id = dms_object.get("objectTypeId")
+    log_object = sampler.log if sampler else logger.log
+
+    try:
+        if not object_id:
+            error_msg = f"Object {dms_object} is missing objectId"
+            logger.warning(error_msg)
+            return _failed_dryrun_item(object_id, object_type_id, field_name, error_msg), None
+        
+        if not object_type_id:
+            error_msg = f"Object {object_id} is missing objectTypeId"
+            logger.warning(error_msg)
+            return _failed_dryrun_item(object_id, object_type_id, field_name, error_msg), None
+        
+        if properties_item is None:
+            # get current values for objectId  
+            response = client.get(f"/api/dms/objects/{object_id}", endpoint="object_get")
+            response.raise_for_status()
+            response_data = response.json()
+
+            objects_list = response_data.get("objects", [])
+            if objects_list:
+                properties_item = objects_list[0].get("properties", {})
+
+        if properties_item is None:
+            error_msg = f"Object {object_id}: No valid object returned from DMS enpoint."
+            log_object(logging.WARNING, error_msg)
+            return {
+                "object_id": object_id,
+                "object_type_id": object_type_id,
+                "status": "0",
+                "change": "missing_object",
+                "details": error_msg,
+                "field": field_name,
+                "current_value": "",
+                "new_value": ""
+            }, None
+        
+        if field_name not in properties_item:
+            error_msg = f"Object {object_id}: Field '{field_name}' does not exist"
+            log_object(logging.WARNING, error_msg)
+            return {
+                "object_id": object_id,
+                "object_type_id": object_type_id,
+                "status": "0",
+                "change": "missing_field",
+                "details": error_msg,
+                "field": field_name,
+                "current_value": "",
+                "new_value": ""
+            }, None
+        
+        current_value = properties_item.get(field_name).get("value", "")
+        
+        # objects that already have the new value need no write
+        if _values_equal(current_value, new_value):
+            return {
+                "object_id": object_id,
+                "object_type_id": object_type_id,
+                "status": "1",
+                "change": "unchanged",
+                "details": "Unchanged",
+                "field": field_name,
+                "current_value": current_value,
+                "new_value": new_value
+            }, None
+        
+        # assemble valid dryrun item
+        dryrun_item = {
+                "object_id": object_id,
+                "object_type_id": object_type_id,
+                "status": "1",
+                "change": "changed",
+                "details": "Go",
+                "field": field_name,
+                "current_value": current_value,
+                "new_value": new_value
+            }
+        
+        # Prepare update payload
+        prepared_payload = {
+            "properties": {
+                "system:objectId": {"value": object_id},
+                "system:objectTypeId": {"value": object_type_id},
+                field_name: {"value": new_value}
+            }
+        }
+        return dryrun_item, prepared_payload
+        
+    except requests.exceptions.HTTPError as e:
+        if e.response.status_code == 404:
+            # deleted since the search, the most common reason for a missing object
+            error_msg = f"Object {object_id}: Not found in DMS (HTTP 404)"
+            log_object(logging.WARNING, error_msg)
+            return {
+                "object_id": object_id,
+                "object_type_id": object_type_id,
+                "status": "0",
+                "change": "missing_object",
+                "details": error_msg,
+                "field": field_name,
+                "current_value": "",
+                "new_value": ""
+            }, None
+        error_msg = f"HTTP error fetching object {object_id}: {e.response.status_code}"
+        logger.error("%s - %s", error_msg, e)
+        
+    except requests.exceptions.Timeout:
+        error_msg = f"Timeout fetching object {object_id}"
+        logger.error(error_msg)
+        
+    except requests.exceptions.RequestException as e:
+        error_msg = f"Request error fetching object {object_id}: {str(e)}"
+        logger.error(error_msg)
+        
+    except (KeyError, AttributeError, TypeError) as e:
+        error_msg = f"Data parsing error: {str(e)}"
+        logger.error(error_msg)
+
+    return _failed_dryrun_item(object_id, object_type_id, field_name, error_msg), None
+
+
+def call_dryrun(search_results, field_name, new_value, workers=None, progress=None,
+                object_type=None, lookup=None):
     """
     Perform a dry run to preview changes before actual update.
     
     Fetches current values for the specified field from each object
-    in the search results and prepares update payloads.
+    in the search results and classifies each object as changed, unchanged or
+    missing the field. Update payloads are only prepared for changed objects,
+    so no-op writes are skipped. An object with a 'newValue' key (bulk upload)
+    is set to that value instead of new_value. With more than one
+    worker the objects are fetched concurrently, the output keeps the input order.
+
+    In 'search' lookup mode the current values are read in chunks with one
+    search request per chunk. Objects missing from the search response fall
+    back to a single GET request.
     
     Args:
-        search_results (list): List of objects from search results, 
-                               each containing at least 'system:objectId' and 'system:objectTypeId'
+        search_results (iterable): Objects from search results (list or generator),
+                                   each containing at least 'objectId' and 'objectTypeId'
+                                   and optionally a per-object 'newValue'
         field_name (str): Name of the field to be updated
-        new_value (str): New value to be set for the field
+        new_value (str): New value to be set for the field of objects without 'newValue'
+        workers (int): Number of concurrent fetches, defaults to DRYRUN_WORKERS
+        progress (callable): Optional callback, called with the number of processed
+                             objects; it may raise to abort the dry run
+        object_type (str): Internal object type name of the objects, required for 'search' lookup
+        lookup (str): 'search' or 'get', defaults to DRYRUN_LOOKUP
     
     Returns:
-        dict: Contains 'dryrun_items' list with before/after comparisons or errors,
-              'payload_items' list ready for passing to the call_update
+        dict: Contains 'result_dryrun' list with before/after comparisons or errors,
+              'result_payloads' list ready for passing to the call_update,
+              'summary' with the counts per classification
     """
     logger = logging.getLogger(__name__)
     
@@ -139,135 +534,225 @@ def call_dryrun(search_results, field_name, new_value):
         logger.error("Invalid field name provided: %s", field_name)
         return {"error": "Invalid field name", "preview": [], "payloads": []}
     
-    api_host = current_app.config["API_HOST"]
-    api_auth = current_app.config["API_AUTH"]
-    api_headers = {"authorization": api_auth}
-    call_proxies = {"http": None, "https": None}
+    # reject unknown object types and fields before fetching any object
+    if object_type:
+        schema_error = current_app.extensions["dms_schema_index"].check(object_type, [field_name])
+        if schema_error:
+            logger.error("Dry run rejected: %s", schema_error)
+            return {"error": schema_error, "preview": [], "payloads": []}
+    
+    if workers is None:
+        workers = current_app.config["DRYRUN_WORKERS"]
+    
+    if lookup is None:
+        lookup = current_app.config["DRYRUN_LOOKUP"]
+    if lookup == "search" and not object_type:
+        logger.info("No object type given for search lookup, using single requests")
+        lookup = "get"
+    
+    # resolve the client and config here, worker threads have no app context
+    client = get_client()
+    sampler = LogSampler(logger, current_app.config["LOG_OBJECT_SAMPLE_EVERY"])
+    
+    def fetch(lookup_item):
+        dms_object, properties_item = lookup_item
+        return _dryrun_object(
+            client, dms_object, field_name, dms_object.get("newValue", new_value), properties_item, sampler
+        )
+    
+    def lookup_items():
+        """Pairs of (object, properties from search lookup or None)"""
+        if lookup != "search":
+            for dms_object in search_results:
+                yield dms_object, None
+            return
+        
+        chunk_size = current_app.config["DRYRUN_LOOKUP_CHUNK"]
+        objects = iter(search_results)
+        while chunk := list(islice(objects, chunk_size)):
+            found = _lookup_by_search(
+                object_type, field_name,
+                [dms_object.get("objectId") for dms_object in chunk if dms_object.get("objectId")]
+            )
+            for dms_object in chunk:
+                yield dms_object, found.get(str(dms_object.get("objectId")))
     
     dryrun_items = []
     payload_items = []
-    
-    logger.info("Starting dry run for %d objects, field: %s", len(search_results), field_name)
-    
-    for dms_object in search_results:
-        try:
-            object_id = dms_object.get("objectId")
-            object_type_id = dms_object.get("objectTypeId")
-            
-            if not object_id:
-                logger.warning("Object %s is missing objectId", str(dms_object))
-                continue
-            
-            if not object_type_id:
-                logger.warning("Object %s is missing objectTypeId", str(dms_object))
-                continue
-            
-            # get current values for objectId  
-            api_endpoint = f"http://{api_host}/api/dms/objects/{object_id}"            
-            response = requests.get(
-                api_endpoint, 
-                headers=api_headers, 
-                timeout=30, 
-                proxies=call_proxies
-            )
-            response.raise_for_status()
-            response_data = response.json()
-
-            objects_list = response_data.get("objects", [])
-            if not objects_list:
-                error_msg = f"Object {object_id}: No valid object returned from DMS enpoint."
-                logger.warning(error_msg)
-                dryrun_items.append({
-                    "object_id": object_id,
-                    "object_type_id": object_type_id,
-                    "status": "0",
-                    "details": error_msg,
-                    "field": field_name,
-                    "current_value": "",
-                    "new_value": ""
-                })
-                continue
-            
-            properties_item = objects_list[0].get("properties", {})
-            if field_name not in properties_item:
-                error_msg = f"Object {object_id}: Field '{field_name}' does not exist"
-                logger.warning(error_msg)
-                dryrun_items.append({
-                    "object_id": object_id,
-                    "object_type_id": object_type_id,
-                    "status": "0",
-                    "details": error_msg,
-                    "field": field_name,
-                    "current_value": "",
-                    "new_value": ""
-                })
-                continue
-            
-            current_value = properties_item.get(field_name).get("value", "")
-            
-            # assemble valid dryrun item
-            dryrun_items.append({
-                    "object_id": object_id,
-                    "object_type_id": object_type_id,
-                    "status": "1",
-                    "details": "Go",
-                    "field": field_name,
-                    "current_value": current_value,
-                    "new_value": new_value
-                })
-            
-            # Prepare update payload
-            prepared_payload = {
-                "objects": [{ 
-                    "properties": {
-                        "system:objectId": {"value": object_id},
-                        "system:objectTypeId": {"value": object_type_id},
-                        field_name: {"value": new_value}
-                    }
-                }]
-            }
-            payload_items.append(prepared_payload)
-            
-            
-        except requests.exceptions.HTTPError as e:
-            error_msg = f"HTTP error fetching object {object_id}: {e.response.status_code}"
-            logger.error("%s - %s", error_msg, e)
-            
-        except requests.exceptions.Timeout:
-            error_msg = f"Timeout fetching object {object_id}"
-            logger.error(error_msg)
-            
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Request error fetching object {object_id}: {str(e)}"
-            logger.error(error_msg)
-            
-        except (KeyError, AttributeError, TypeError) as e:
-            error_msg = f"Data parsing error: {str(e)}"
-            logger.error(error_msg)
+    summary = {"total": 0, "changed": 0, "unchanged": 0, "missing_field": 0, "missing_object": 0, "failed": 0}
+    
+    logger.info("Starting dry run for field: %s with %d workers, lookup: %s", field_name, workers, lookup)
+    
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        for dryrun_item, prepared_payload in _ordered_map(executor, fetch, lookup_items(), workers * 4):
+            summary["total"] += 1
+            dryrun_items.append(dryrun_item)
+            summary[dryrun_item["change"]] += 1
+            if prepared_payload:
+                payload_items.append(prepared_payload)
+            if progress:
+                progress(1)
        
+    sampler.flush("Dry run")
     logger.info(
-        "Dry run completed: %d previews, %d payloads", len(dryrun_items), len(payload_items)
+        "Dry run completed: %d previews, %d payloads, %d unchanged, %d missing field",
+        len(dryrun_items), len(payload_items), summary["unchanged"], summary["missing_field"]
     )
     
     return {
         "result_dryrun": dryrun_items,
-        "result_payloads": payload_items
+        "result_payloads": payload_items,
+        "summary": summary
     }
 
 
-def call_update(update_payloads):
+def _update_chunk(client, chunk, api_headers, query_params, retry=False, sampler=None):
+    """
+    Send one chunk of objects in a single update request.
+
+    If the DMS rejects the payload (HTTP 400, 404, 409, 422), the chunk is split
+    in halves and each half is sent again, down to single objects, so every
+    object gets its own result entry. Authorization failures (401, 403) and
+    throttling that outlasted the client's backoff (429) would fail every half
+    the same way, all objects of the chunk are reported failed. Other failures
+    may have been applied already: the chunk is only split and sent again with
+    retry, otherwise all its objects are left to a resume of the update journal.
+
+    Args:
+        client (DMSClient): Client to send the request with
+        chunk (list): Tuples of (index, object_id, payload)
+        retry (bool): Retry transient failures, only if updates are safe to repeat
+        sampler (LogSampler): Optional sampler for the per-object and payload log records
+
+    Returns:
+        list: Per-object result dicts in chunk order
+    """
+    logger = logging.getLogger(__name__)
+    if sampler is None:
+        sampler = LogSampler(logger, every=1)
+
+    api_path = "/api/dms/objects"
+    api_payload = {"objects": [payload for _, _, payload in chunk]}
+    first_object_id = chunk[0][1]
+
+    if len(chunk) == 1:
+        sampler.log(logging.INFO, "Updating object %s (index %d)", first_object_id, chunk[0][0])
+    else:
+        logger.info("Updating %d objects (index %d to %d)", len(chunk), chunk[0][0], chunk[-1][0])
+    if logger.isEnabledFor(logging.DEBUG):
+        sampler.log(logging.DEBUG, "Update payload: %s", api_payload)
+
+    try:
+        # Execute update request
+        response = client.post(
+            api_path,
+            json=api_payload,
+            headers=api_headers,
+            params=query_params,
+            endpoint="update",
+            idempotent=retry
+        )
+        
+        # Log response details
+        if logger.isEnabledFor(logging.DEBUG):
+            sampler.log(
+                logging.DEBUG, "Object %s response: status=%d, content=%s",
+                first_object_id, response.status_code, response.text[:200]
+            )
+        
+        response.raise_for_status()
+        
+        # Parse response
+        response_data = response.json()
+
+    except (requests.exceptions.RequestException, ValueError) as e:
+        status_code = e.response.status_code if isinstance(e, requests.exceptions.HTTPError) else None
+        rejected = status_code in PAYLOAD_REJECTED_STATUS_CODES
+        transient = status_code is None or status_code >= 500
+
+        if len(chunk) > 1 and (rejected or (retry and transient)):
+            middle = len(chunk) // 2
+            logger.warning("Update of %d objects failed, splitting chunk: %s", len(chunk), e)
+            return (
+                _update_chunk(client, chunk[:middle], api_headers, query_params, retry, sampler)
+                + _update_chunk(client, chunk[middle:], api_headers, query_params, retry, sampler)
+            )
+
+        if status_code is not None:
+            error_msg = f"HTTP error {status_code}: {e.response.text[:200]}"
+        elif isinstance(e, requests.exceptions.Timeout):
+            error_msg = "Request timeout"
+        elif isinstance(e, requests.exceptions.RequestException):
+            error_msg = f"Request error: {str(e)}"
+        else:
+            error_msg = f"Data processing error: {str(e)}"
+
+        if len(chunk) == 1:
+            logger.error("Failed to update object %s: %s", first_object_id, error_msg)
+        else:
+            # the DMS may have applied the chunk, sending it again is not safe
+            logger.error(
+                "Update of %d objects (index %d to %d) failed, not sent again: %s",
+                len(chunk), chunk[0][0], chunk[-1][0], error_msg
+            )
+
+        failed_results = []
+        for idx, object_id, _ in chunk:
+            failed_result = {
+                "index": idx,
+                "object_id": object_id,
+                "status": "failed",
+                "error": error_msg
+            }
+            if status_code is not None:
+                failed_result["status_code"] = status_code
+            failed_results.append(failed_result)
+        return failed_results
+
+    # map response objects to the sent objects if the DMS returned one per object
+    response_objects = response_data.get("objects", []) if isinstance(response_data, dict) else []
+    if len(response_objects) != len(chunk):
+        response_objects = [response_data] * len(chunk)
+
+    chunk_results = []
+    for (idx, object_id, _), object_response in zip(chunk, response_objects):
+        chunk_results.append({
+            "index": idx,
+            "object_id": object_id,
+            "status": "success",
+            "status_code": response.status_code,
+            "response": object_response
+        })
+        sampler.log(logging.INFO, "Successfully updated object %s", object_id)
+
+    return chunk_results
+
+
+def call_update(update_payloads, chunk_size=None, progress=None, journal=None, on_results=None):
     """
     Execute batch update of DMS objects.
     
-    Updates objects one by one using prepared payloads from dry run.
-    Each update is logged individually for traceability.
+    Sends the prepared payloads from dry run in chunks of chunk_size objects per
+    request. A chunk rejected by the DMS is split and sent again, so each object
+    is still reported individually for traceability.
+
+    With a journal every outcome is recorded as soon as its chunk completes,
+    and objects already committed in the journal are skipped (resume).
     
     Args:
-        update_payloads (list): List of payload dictionaries prepared by call_dryrun,
-                                each containing object properties to update
+        update_payloads (iterable): Payload dictionaries prepared by call_dryrun (list or
+                                    generator), each containing object properties to update
+        chunk_size (int): Objects per update request, defaults to UPDATE_CHUNK_SIZE
+        progress (callable): Optional callback, called with the number of processed
+                             objects; it may raise to abort the update
+        journal (UpdateJournal): Optional journal of the update run
+        on_results (callable): Optional callback, called with each list of per-object
+                               outcomes in payload order as they are produced; they
+                               are then not collected, so memory does not grow with
+                               the number of payloads
     
     Returns:
-        dict: Contains 'results' list with per-object outcomes,
+        dict: Contains 'results' list with per-object outcomes (empty with on_results),
               'summary' with success/failure counts, and any 'errors'
     """
     logger = logging.getLogger(__name__)
@@ -281,7 +766,7 @@ def call_update(update_payloads):
             "summary": {"total": 0, "successful": 0, "failed": 0}
         }
     
-    if not isinstance(update_payloads, list):
+    if isinstance(update_payloads, (dict, str)):
         logger.error("Invalid payload format: expected list, got %s", type(update_payloads))
         return {
             "error": "Invalid payload format",
@@ -289,139 +774,187 @@ def call_update(update_payloads):
             "summary": {"total": 0, "successful": 0, "failed": 0}
         }
     
-    api_host = current_app.config["API_HOST"]
-    api_auth = current_app.config["API_AUTH"]
-    api_endpoint = f"http://{api_host}/api/dms/objects"
+    if chunk_size is None:
+        chunk_size = current_app.config["UPDATE_CHUNK_SIZE"]
+    chunk_size = max(chunk_size, 1)
+    
+    client = get_client()
     api_headers = {
-        "authorization": api_auth,
         "accept": "application/json",
         "content-type": "application/json"
     }
-    call_proxies = {"http": None, "https": None}
     query_params = {"minimalResponse": "true"}
+    retry = current_app.config["DMS_RETRY_UPDATES"]
+    committed = journal.committed_indexes() if journal else set()
+    sampler = LogSampler(logger, current_app.config["LOG_OBJECT_SAMPLE_EVERY"])
     
     update_results = []
-    successful_updates = 0
-    failed_updates = 0
-    
-    logger.info("Starting batch update for %d objects", len(update_payloads))
-    
+    counts = {"success": 0, "skipped": 0, "failed": 0}
+    chunk = []
+    # skipped and invalid payloads between the objects of the pending chunk, emitted with it
+    held_results = []
+    
+    def emit(results):
+        for result in results:
+            counts[result["status"]] += 1
+        if on_results:
+            on_results(results)
+        else:
+            update_results.extend(results)
+    
+    def send_chunk():
+        nonlocal chunk
+        try:
+            chunk_results = _update_chunk(client, chunk, api_headers, query_params, retry, sampler)
+        finally:
+            # after the write, so a search running meanwhile can not cache the old values again;
+            # also after a failed chunk, which may have been applied in part
+            invalidate_search_cache([object_id for _, object_id, _ in chunk])
+        if journal:
+            journal.record(chunk_results)
+        emit(sorted(held_results + chunk_results, key=lambda result: result["index"]))
+        held_results.clear()
+        if progress:
+            progress(len(chunk))
+        chunk = []
+    
+    def hold(result):
+        # outcomes are emitted in payload order, so they wait for the pending chunk
+        if not chunk:
+            emit([result])
+            return
+        held_results.append(result)
+        if len(held_results) >= chunk_size:
+            send_chunk()
+    
+    logger.info("Starting batch update in chunks of %d", chunk_size)
+    if committed:
+        logger.info("Resuming update, %d objects already committed", len(committed))
+    
+    # payloads are consumed one by one, so a generator keeps memory bounded
+    total = 0
     for idx, payload in enumerate(update_payloads):
+        total += 1
+        
+        # payloads may still be wrapped in an 'objects' array
+        if isinstance(payload, dict) and "properties" not in payload and len(payload.get("objects", [])) == 1:
+            payload = payload["objects"][0]
+        
+        # Extract object ID for logging
         try:
-            # Extract object ID for logging
             object_id = payload.get("properties", {}).get("system:objectId", {}).get("value", "unknown")
-            
-            # Validate payload structure
-            if "properties" not in payload:
-                error_msg = f"Invalid payload structure at index {idx}: missing 'properties'"
-                logger.error(error_msg)
-                failed_updates += 1
-                update_results.append({
-                    "index": idx,
-                    "object_id": object_id,
-                    "status": "failed",
-                    "error": error_msg
-                })
-                continue
-            
-            # Wrap payload in 'objects' array as required by API
-            api_payload = {"objects": [payload]}
-            
-            logger.info("Updating object %s (index %d)", object_id, idx)
-            logger.debug("Update payload: %s", api_payload)
-            
-            # Execute update request
-            response = requests.post(
-                api_endpoint,
-                json=api_payload,
-                headers=api_headers,
-                params=query_params,
-                timeout=30,
-                proxies=call_proxies
-            )
-            
-            # Log response details
-            logger.debug(
-                "Object %s response: status=%d, content=%s",
-                object_id, response.status_code, response.text[:200]
-            )
-            
-            response.raise_for_status()
-            
-            # Parse response
-            response_data = response.json()
-            
-            successful_updates += 1
-            update_results.append({
-                "index": idx,
-                "object_id": object_id,
-                "status": "success",
-                "status_code": response.status_code,
-                "response": response_data
-            })
-            
-            logger.info("Successfully updated object %s", object_id)
-            
-        except requests.exceptions.HTTPError as e:
-            error_msg = f"HTTP error {e.response.status_code}: {e.response.text[:200]}"
-            logger.error("Failed to update object %s: %s", object_id, error_msg)
-            failed_updates += 1
-            update_results.append({
-                "index": idx,
-                "object_id": object_id,
-                "status": "failed",
-                "status_code": e.response.status_code if hasattr(e, 'response') else None,
-                "error": error_msg
-            })
-            
-        except requests.exceptions.Timeout:
-            error_msg = "Request timeout"
-            logger.error("Timeout updating object %s", object_id)
-            failed_updates += 1
-            update_results.append({
-                "index": idx,
-                "object_id": object_id,
-                "status": "failed",
-                "error": error_msg
-            })
-            
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Request error: {str(e)}"
-            logger.error("Request error updating object %s: %s", object_id, error_msg)
-            failed_updates += 1
-            update_results.append({
+        except AttributeError:
+            object_id = "unknown"
+        
+        if idx in committed:
+            hold({
                 "index": idx,
                 "object_id": object_id,
-                "status": "failed",
-                "error": error_msg
+                "status": "skipped",
+                "details": "Already committed in a previous run"
             })
-            
-        except (ValueError, KeyError, TypeError) as e:
-            error_msg = f"Data processing error: {str(e)}"
-            logger.error("Error processing payload at index %d: %s", idx, error_msg)
-            failed_updates += 1
-            update_results.append({
+            if progress:
+                progress(1)
+            continue
+        
+        # Validate payload structure
+        if not isinstance(payload, dict) or "properties" not in payload:
+            error_msg = f"Invalid payload structure at index {idx}: missing 'properties'"
+            logger.error(error_msg)
+            invalid_result = {
                 "index": idx,
                 "object_id": object_id,
                 "status": "failed",
                 "error": error_msg
-            })
+            }
+            if journal:
+                journal.record([invalid_result])
+            hold(invalid_result)
+            if progress:
+                progress(1)
+            continue
+        
+        chunk.append((idx, object_id, payload))
+        if len(chunk) >= chunk_size:
+            send_chunk()
+    
+    if chunk:
+        send_chunk()
+    
+    if not total:
+        logger.warning("Update called with empty payloads")
+        return {
+            "error": "No payloads provided",
+            "results": [],
+            "summary": {"total": 0, "successful": 0, "failed": 0}
+        }
+    
+    successful_updates = counts["success"]
+    skipped_updates = counts["skipped"]
+    failed_updates = counts["failed"]
     
     # Generate summary
     summary = {
-        "total": len(update_payloads),
+        "total": total,
         "successful": successful_updates,
+        "skipped": skipped_updates,
         "failed": failed_updates,
-        "success_rate": f"{(successful_updates/len(update_payloads)*100):.1f}%" if update_payloads else "0%"
+        "success_rate": f"{((successful_updates + skipped_updates)/total*100):.1f}%" if total else "0%"
     }
     
+    sampler.flush("Batch update")
     logger.info(
-        "Batch update completed: %d total, %d successful, %d failed",
-        summary["total"], summary["successful"], summary["failed"]
+        "Batch update completed: %d total, %d successful, %d skipped, %d failed",
+        summary["total"], summary["successful"], summary["skipped"], summary["failed"]
     )
     
+    if journal:
+        journal.finish(summary)
+    
     return {
         "results": update_results,
         "summary": summary
     }
 
+
+def invalidate_schema_cache(object_id=None):
+    """
+    Drop cached schema responses.
+
+    Without object_id the full schema and all object type schemas are dropped,
+    otherwise only the schema of the given object type.
+
+    Returns:
+        int: Number of dropped cache entries
+    """
+    logger = logging.getLogger(__name__)
+
+    cache = current_app.extensions["dms_schema_cache"]
+    if object_id is None:
+        dropped = cache.invalidate()
+    else:
+        dropped = cache.invalidate(f"/api/dms/schema/objecttype/{object_id}")
+
+    logger.info("Schema cache invalidated: %d entries dropped", dropped)
+    return dropped
+
+
+def invalidate_search_cache(object_ids=None):
+    """
+    Drop cached search pages containing one of object_ids, or all pages without ids.
+
+    Returns:
+        int: Number of dropped pages
+    """
+    logger = logging.getLogger(__name__)
+
+    cache = current_app.extensions["dms_search_cache"]
+    if cache is None:
+        return 0
+    if object_ids is None:
+        dropped = cache.invalidate()
+    else:
+        dropped = cache.invalidate_tags(str(object_id) for object_id in object_ids)
+    if dropped:
+        logger.debug("Search cache invalidated: %d pages dropped", dropped)
+    return dropped
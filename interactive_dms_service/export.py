@@ -0,0 +1,89 @@
+"""Encoding of search result pages for downloads and the JSON API"""
+
+import csv
+import io
+import json
+import zlib
+from itertools import chain
+
+
+def object_row(dms_object):
+    """objectId, objectTypeId and the non-system property values of a DMS object"""
+    properties = dms_object.get("properties", {})
+    return {
+        "objectId": properties.get("system:objectId", {}).get("value"),
+        "objectTypeId": properties.get("system:objectTypeId", {}).get("value"),
+        "values": {
+            key: value.get("value") for key, value in properties.items()
+            if not key.startswith("system:") and isinstance(value, dict)
+        }
+    }
+
+
+def export_lines(objects_pages, export_format, fields=None):
+    """
+    Generator encoding search result pages as CSV or NDJSON text, one chunk per page.
+
+    CSV columns are the properties of the first object. Without any object
+    the header row is written from fields, the requested field names.
+    """
+    headers = None
+    for objects in objects_pages:
+        buffer = io.StringIO()
+        if export_format == "csv":
+            writer = csv.writer(buffer)
+            if headers is None:
+                # columns of the first object, like the result table
+                headers = [
+                    key for key in objects[0].get("properties", {}).keys()
+                    if not key.startswith("system:")
+                ]
+                writer.writerow(["objectId", "objectTypeId"] + headers)
+            for dms_object in objects:
+                properties = dms_object.get("properties", {})
+                writer.writerow(
+                    [
+                        properties.get("system:objectId", {}).get("value"),
+                        properties.get("system:objectTypeId", {}).get("value")
+                    ]
+                    + [properties.get(key, {}).get("value", "") for key in headers]
+                )
+        else:
+            for dms_object in objects:
+                buffer.write(json.dumps(object_row(dms_object)) + "\n")
+        yield buffer.getvalue()
+
+    if export_format == "csv" and headers is None:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(
+            ["objectId", "objectTypeId"] + [field for field in fields or [] if not field.startswith("system:")]
+        )
+        yield buffer.getvalue()
+
+
+def prefetch_pages(pages, errors):
+    """
+    Request the first page of an iter_search generator ahead of a streamed response.
+
+    A search failing on its first page can then be answered with an error
+    status before any bytes are sent.
+
+    Args:
+        pages (generator): iter_search generator, created with errors
+        errors (list): The errors list passed to iter_search
+
+    Returns:
+        iterator: All pages including the first, None if the first page failed
+    """
+    first_page = next(pages, None)
+    if errors:
+        return None
+    return chain([first_page], pages) if first_page is not None else iter(())
+
+
+def gzip_chunks(chunks):
+    """Generator compressing text chunks into one gzip stream, flushed after every chunk"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        yield compressor.compress(chunk.encode("utf-8")) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
@@ -1,8 +1,10 @@
 """Collection of used wtf_Forms"""
 
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileField, FileRequired, FileAllowed
 from wtforms import StringField, SubmitField
-from wtforms.validators import DataRequired, Length
+from wtforms.validators import DataRequired, Length, ValidationError
+from .schema_index import get_schema_index
 
 class SearchForm(FlaskForm):
     """Simple Search Query Form"""
@@ -45,6 +47,21 @@ class SearchForm(FlaskForm):
         render_kw={'class': 'btn btn-primary'}
     )
 
+    def validate_folder(self, folder):
+        """Reject unknown object types without asking the DMS"""
+        schema_error = get_schema_index().check(folder.data.strip())
+        if schema_error:
+            raise ValidationError(schema_error)
+
+    def validate_field(self, field):
+        """Reject unknown fields of a known object type without asking the DMS"""
+        folder_name = (self.folder.data or '').strip()
+        field_names = [name.strip() for name in (field.data or '').split(',') if name.strip()]
+        if folder_name and field_names and get_schema_index().object_type_id(folder_name) is not None:
+            schema_error = get_schema_index().check(folder_name, field_names)
+            if schema_error:
+                raise ValidationError(schema_error)
+
 
 class UpdateForm(FlaskForm):
     """Simple Set Field to Value Form"""
@@ -73,4 +90,124 @@ class UpdateForm(FlaskForm):
     start = SubmitField(
         'Start Dry Run',
         render_kw={'class': 'btn btn-primary'}
-    )    
\ No newline at end of file
+    )    
+    
+    preview = SubmitField(
+        'Preview first page',
+        render_kw={'class': 'btn btn-secondary'}
+    )
+
+    # internal name of the object type of the stored search, set by the route
+    object_type = None
+
+    def validate_field(self, field):
+        """Reject fields that do not exist in the object type of the search results"""
+        if self.object_type:
+            schema_error = get_schema_index().check(self.object_type, [field.data.strip()])
+            if schema_error:
+                raise ValidationError(schema_error)
+
+
+class ExecuteForm(FlaskForm):
+    """Confirm the update prepared by a dry run"""
+    
+    execute = SubmitField(
+        'Execute Update',
+        render_kw={'class': 'btn btn-danger'}
+    )
+
+
+class CancelForm(FlaskForm):
+    """Cancel a running background job"""
+    
+    cancel = SubmitField(
+        'Cancel Job',
+        render_kw={'class': 'btn btn-secondary'}
+    )
+
+
+class ResumeForm(FlaskForm):
+    """Resume an interrupted update run"""
+    
+    resume = SubmitField(
+        'Resume Update',
+        render_kw={'class': 'btn btn-primary'}
+    )
+
+
+class RollbackForm(FlaskForm):
+    """Restore the before-values of an update run"""
+    
+    rollback = SubmitField(
+        'Rollback',
+        render_kw={'class': 'btn btn-danger'}
+    )
+
+
+class UploadForm(FlaskForm):
+    """Bulk update file with per-object values"""
+
+    folder = StringField(
+        'Internal Folder name',
+        validators=[
+            DataRequired(message='Provide a folder name'),
+            Length(min=1, max=100, message='Folder name must be between 1 and 100 characters')
+        ],
+        render_kw={
+            'placeholder': 'Enter internal folder name',
+            'class': 'form-control'
+        }
+    )
+
+    upload = FileField(
+        'CSV or NDJSON file (objectId, optional objectTypeId, one field column)',
+        validators=[
+            FileRequired(message='Choose a file'),
+            FileAllowed(['csv', 'ndjson', 'jsonl'], message='Only CSV and NDJSON files are supported')
+        ]
+    )
+
+    start = SubmitField(
+        'Upload and start dry run',
+        render_kw={'class': 'btn btn-primary'}
+    )
+
+
+class SaveSearchForm(FlaskForm):
+    """Name under which the current search is saved"""
+
+    name = StringField(
+        'Name',
+        validators=[
+            DataRequired(message='Provide a name'),
+            Length(min=1, max=100, message='Name must be between 1 and 100 characters')
+        ],
+        render_kw={
+            'placeholder': 'Enter a name for the search',
+            'class': 'form-control'
+        }
+    )
+
+    save = SubmitField(
+        'Save search',
+        render_kw={'class': 'btn btn-primary'}
+    )
+
+
+class RefreshForm(FlaskForm):
+    """Refresh or delete a saved search"""
+
+    refresh = SubmitField(
+        'Refresh',
+        render_kw={'class': 'btn btn-primary'}
+    )
+
+    full = SubmitField(
+        'Full refresh',
+        render_kw={'class': 'btn btn-secondary'}
+    )
+
+    delete = SubmitField(
+        'Delete',
+        render_kw={'class': 'btn btn-danger'}
+    )
@@ -0,0 +1,363 @@
+"""Background execution of long running dry runs and updates"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from flask import current_app
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job after cancellation was requested"""
+
+
+class Job:
+    """
+    State and progress of a single background job.
+
+    The process that runs the job owns it, other processes see the copy in
+    the job table that the owner writes on state changes and every
+    sync_interval seconds of progress, see JobManager.
+    """
+
+    def __init__(self, kind, description="", key=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.description = description
+        self.key = key
+        self.status = "queued"
+        self.total = 0
+        self.done = 0
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.pid = os.getpid()
+        self._cancel_event = threading.Event()
+        # set by the owning JobManager: called with the job to write progress and read cancellation
+        self._sync = None
+        self._synced = 0.0
+        self.sync_interval = 1.0
+
+    @classmethod
+    def from_row(cls, row):
+        """Job as stored in the job table, without the ability to run"""
+        job = cls(row["kind"], row["description"], row["key"])
+        job.id = row["id"]
+        for name in ("status", "total", "done", "error", "created", "started", "finished", "pid"):
+            setattr(job, name, row[name])
+        job.result = json.loads(row["result"]) if row["result"] else None
+        if row["cancel_requested"]:
+            job._cancel_event.set()
+        return job
+
+    @property
+    def cancelled(self):
+        """True once cancellation was requested"""
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """Request cancellation, a running job stops at its next progress step"""
+        self._cancel_event.set()
+        if self.status == "queued":
+            self.status = "cancelled"
+            self.finished = time.time()
+
+    def advance(self, count=1):
+        """
+        Progress callback for call_dryrun and call_update.
+
+        Raises JobCancelled if the job was cancelled in the meantime.
+        """
+        self.done += count
+        if self._sync is not None and time.time() - self._synced >= self.sync_interval:
+            self._synced = time.time()
+            self._sync(self)
+        if self.cancelled:
+            raise JobCancelled(self.id)
+
+    @property
+    def is_finished(self):
+        """True if the job will not change anymore"""
+        return self.status in ("finished", "failed", "cancelled")
+
+    def to_dict(self):
+        """JSON representation for the status endpoint"""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "description": self.description,
+            "status": self.status,
+            "progress": {
+                "done": self.done,
+                "total": self.total,
+                "percent": round(self.done / self.total * 100, 1) if self.total else 0.0
+            },
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished
+        }
+
+
+class JobManager:
+    """
+    Local worker pool executing jobs in the background.
+
+    Jobs run inside an app context of the given flask app, so dmsapi functions
+    can be used unchanged. Every job is also kept in a table of the SQLite
+    database at path, so all worker processes of the app can show its status,
+    cancel it and find it with find_active. A job whose owning process is gone
+    is reported failed. Finished jobs are kept for retention_minutes.
+    """
+
+    ACTIVE_STATUSES = ("queued", "running")
+
+    def __init__(self, app, path, workers=2, retention_minutes=60):
+        self.app = app
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.retention = retention_minutes * 60
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dms-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+        connection = self._connect()
+        with connection:
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    description TEXT,
+                    key TEXT,
+                    status TEXT NOT NULL,
+                    total INTEGER NOT NULL,
+                    done INTEGER NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created REAL NOT NULL,
+                    started REAL,
+                    finished REAL,
+                    pid INTEGER NOT NULL,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, status);
+                """
+            )
+        connection.close()
+
+    @classmethod
+    def from_config(cls, app):
+        """Create a job manager in the database file of the result store"""
+        return cls(
+            app,
+            app.config["RESULT_STORE_PATH"],
+            workers=app.config["JOB_WORKERS"],
+            retention_minutes=app.config["JOB_RETENTION_MINUTES"],
+        )
+
+    def _connect(self):
+        """Open a new connection, each thread uses its own"""
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def _save(self, job):
+        """Write the state of an owned job, a cancellation requested elsewhere is kept"""
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                "INSERT INTO jobs (id, kind, description, key, status, total, done, result, error, "
+                "created, started, finished, pid) "
+                "VALUES (:id, :kind, :description, :key, :status, :total, :done, :result, :error, "
+                ":created, :started, :finished, :pid) "
+                "ON CONFLICT (id) DO UPDATE SET status = excluded.status, total = excluded.total, "
+                "done = excluded.done, result = excluded.result, error = excluded.error, "
+                "started = excluded.started, finished = excluded.finished",
+                {
+                    "id": job.id, "kind": job.kind, "description": job.description, "key": job.key,
+                    "status": job.status, "total": job.total, "done": job.done,
+                    "result": json.dumps(job.result, default=str) if job.result is not None else None,
+                    "error": job.error, "created": job.created, "started": job.started,
+                    "finished": job.finished, "pid": job.pid
+                }
+            )
+        connection.close()
+
+    def _sync(self, job):
+        """Progress callback of an owned job: write its progress, pick up a cancellation from another process"""
+        connection = self._connect()
+        with connection:
+            connection.execute("UPDATE jobs SET done = ? WHERE id = ?", (job.done, job.id))
+            row = connection.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job.id,)).fetchone()
+        connection.close()
+        if row and row["cancel_requested"]:
+            job._cancel_event.set()
+
+    def _load(self, where, params):
+        """Jobs from the job table, active jobs of ended processes are marked failed"""
+        connection = self._connect()
+        try:
+            rows = connection.execute(f"SELECT * FROM jobs WHERE {where}", params).fetchall()
+        finally:
+            connection.close()
+
+        jobs = []
+        for row in rows:
+            job = Job.from_row(row)
+            if job.status in self.ACTIVE_STATUSES and job.pid != os.getpid() and not _process_alive(job.pid):
+                job.status = "failed"
+                job.error = f"Worker process {job.pid} ended before the job finished"
+            jobs.append(job)
+        return jobs
+
+    def submit(self, kind, func, *args, total=0, description="", key=None, cleanup=None, **kwargs):
+        """
+        Queue func for background execution.
+
+        func is called as func(*args, progress=job.advance, **kwargs),
+        its return value becomes the job result. key optionally identifies
+        the work item, see find_active. cleanup is called without arguments
+        once the job has ended, also if it was cancelled before it started.
+
+        Returns:
+            Job: the queued job
+        """
+        logger = logging.getLogger(__name__)
+
+        job = Job(kind, description, key)
+        job.total = total
+        job._sync = self._sync
+
+        with self._lock:
+            self._purge()
+            self._jobs[job.id] = job
+        self._save(job)
+
+        self._executor.submit(self._run, job, func, args, kwargs, cleanup)
+        logger.info("Job %s (%s) queued: %s", job.id, kind, description)
+        return job
+
+    def get(self, job_id):
+        """Return the job for job_id or None, jobs of other processes as read from the job table"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job:
+            return job
+        jobs = self._load("id = ?", (job_id,))
+        return jobs[0] if jobs else None
+
+    def find_active(self, key):
+        """Return a queued or running job submitted with key in any process, or None"""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.key == key and not job.is_finished:
+                    return job
+        for job in self._load("key = ? AND status IN ('queued', 'running')", (key,)):
+            if not job.is_finished:
+                return job
+        return None
+
+    def cancel(self, job_id):
+        """Request cancellation of a job, returns the job or None"""
+        logger = logging.getLogger(__name__)
+
+        job = self.get(job_id)
+        if job and not job.is_finished:
+            job.cancel()
+            connection = self._connect()
+            with connection:
+                # a running job stops at its next progress step in the process that owns it
+                connection.execute(
+                    "UPDATE jobs SET cancel_requested = 1, "
+                    "finished = CASE WHEN status = 'queued' THEN ? ELSE finished END, "
+                    "status = CASE WHEN status = 'queued' THEN 'cancelled' ELSE status END "
+                    "WHERE id = ?",
+                    (time.time(), job_id)
+                )
+            connection.close()
+            logger.info("Job %s cancellation requested", job_id)
+        return job
+
+    def _run(self, job, func, args, kwargs, cleanup=None):
+        """Execute a job inside an app context"""
+        logger = logging.getLogger(__name__)
+
+        try:
+            # a cancellation from another process is only in the job table
+            self._sync(job)
+            if not job.cancelled:
+                self._execute(job, func, args, kwargs)
+            elif job.status == "queued":
+                job.status = "cancelled"
+                job.finished = time.time()
+                self._save(job)
+        finally:
+            if cleanup:
+                try:
+                    cleanup()
+                except Exception:
+                    logger.exception("Cleanup of job %s (%s) failed", job.id, job.kind)
+
+    def _execute(self, job, func, args, kwargs):
+        """Run func of a job and record its outcome"""
+        logger = logging.getLogger(__name__)
+
+        job.status = "running"
+        job.started = time.time()
+        self._save(job)
+        logger.info("Job %s (%s) started", job.id, job.kind)
+
+        try:
+            with self.app.app_context():
+                job.result = func(*args, progress=job.advance, **kwargs)
+            job.status = "finished"
+            logger.info("Job %s (%s) finished", job.id, job.kind)
+        except JobCancelled:
+            job.status = "cancelled"
+            logger.info("Job %s (%s) cancelled after %d of %d items", job.id, job.kind, job.done, job.total)
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+        finally:
+            job.finished = time.time()
+            self._save(job)
+
+    def _purge(self):
+        """Drop finished jobs older than the retention time, caller holds the lock"""
+        limit = time.time() - self.retention
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.is_finished and job.finished and job.finished < limit
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+        connection = self._connect()
+        with connection:
+            connection.execute("DELETE FROM jobs WHERE finished IS NOT NULL AND finished < ?", (limit,))
+        connection.close()
+
+
+def _process_alive(pid):
+    """True if a process with pid exists on this host"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def get_jobs():
+    """Return the app-scoped JobManager created in create_app"""
+    return current_app.extensions["dms_jobs"]
@@ -0,0 +1,179 @@
+"""Append-only journal of update runs for crash-safe resume"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+
+class UpdateJournal:
+    """
+    JSON lines journal of a single update run.
+
+    The first line describes the run, followed by the before-image of the
+    objects to change (objectId, objectTypeId, field, old value). Every completed
+    object appends one result line, which is flushed and synced before the next
+    chunk is sent. A run without finish line was interrupted and can be resumed,
+    objects with a 'success' line are skipped then. The before-image of the
+    successful objects is the source for a rollback.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.run_id = self.path.stem
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, directory, payloads_id, total, before_image=None, rollback_of=None):
+        """
+        Start the journal of a new update run.
+
+        Args:
+            before_image (iterable): Optional dicts with 'objectId', 'objectTypeId',
+                                     'field' and 'value' before the update
+            rollback_of (str): run_id of the run this run rolls back
+        """
+        logger = logging.getLogger(__name__)
+
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        journal = cls(directory / f"{uuid.uuid4().hex}.jsonl")
+        journal._append([{
+            "type": "start",
+            "run_id": journal.run_id,
+            "payloads_id": payloads_id,
+            "total": total,
+            "rollback_of": rollback_of,
+            "created": time.time()
+        }])
+
+        if before_image is not None:
+            batch = []
+            for before in before_image:
+                batch.append({"type": "before", **before})
+                if len(batch) >= 1000:
+                    journal._append(batch)
+                    batch = []
+            if batch:
+                journal._append(batch)
+
+        logger.info("Update journal %s created for %d objects", journal.run_id, total)
+        return journal
+
+    @classmethod
+    def open(cls, directory, run_id):
+        """Journal of an existing run, None if it does not exist"""
+        path = Path(directory) / f"{run_id}.jsonl"
+        if not run_id.isalnum() or not path.is_file():
+            return None
+        return cls(path)
+
+    @classmethod
+    def list_runs(cls, directory):
+        """Header and state of all journaled runs, newest first"""
+        directory = Path(directory)
+        if not directory.is_dir():
+            return []
+
+        runs = []
+        for path in directory.glob("*.jsonl"):
+            journal = cls(path)
+            header = journal.header()
+            if header:
+                state = journal.state()
+                runs.append({
+                    **header,
+                    "finished": state["finished"],
+                    "committed": state["committed"],
+                    "before_image": state["before_image"]
+                })
+        runs.sort(key=lambda run: run.get("created", 0), reverse=True)
+        return runs
+
+    def _append(self, records):
+        """Append records and make sure they are on disk"""
+        with self._lock, self.path.open("a", encoding="utf-8") as journal_file:
+            journal_file.write("".join(json.dumps(record) + "\n" for record in records))
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+
+    def read(self):
+        """Generator over all records, a torn last line from a crash is ignored"""
+        logger = logging.getLogger(__name__)
+
+        with self.path.open(encoding="utf-8") as journal_file:
+            for line in journal_file:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping incomplete line in update journal %s", self.run_id)
+
+    def header(self):
+        """The start record of the run"""
+        for record in self.read():
+            return record if record.get("type") == "start" else None
+        return None
+
+    def record(self, results):
+        """Append the outcome of completed objects"""
+        self._append([
+            {
+                "type": "result",
+                "index": result["index"],
+                "object_id": result["object_id"],
+                "status": result["status"],
+                "error": result.get("error")
+            }
+            for result in results
+        ])
+
+    def finish(self, summary):
+        """Mark the run as completed"""
+        self._append([{"type": "finish", "summary": summary, "finished": time.time()}])
+
+    def committed_indexes(self):
+        """Payload indexes that were already written successfully"""
+        return self.state()["committed_indexes"]
+
+    def before_image(self):
+        """Generator over the before-image records of the run"""
+        for record in self.read():
+            if record.get("type") == "before":
+                yield record
+
+    def succeeded_object_ids(self):
+        """Ids of the objects written successfully in this run"""
+        succeeded = set()
+        for record in self.read():
+            if record.get("type") != "result":
+                continue
+            if record["status"] == "success":
+                succeeded.add(record["object_id"])
+            elif record["status"] == "failed":
+                succeeded.discard(record["object_id"])
+        return succeeded
+
+    def state(self):
+        """Completion state of the run from its records"""
+        finished = False
+        before_image = 0
+        committed = set()
+        for record in self.read():
+            if record.get("type") == "finish":
+                finished = True
+            elif record.get("type") == "before":
+                before_image += 1
+            elif record.get("type") == "result":
+                if record["status"] in ("success", "skipped"):
+                    committed.add(record["index"])
+                else:
+                    committed.discard(record["index"])
+        return {
+            "finished": finished,
+            "committed": len(committed),
+            "committed_indexes": committed,
+            "before_image": before_image
+        }
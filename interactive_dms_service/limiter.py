@@ -0,0 +1,99 @@
+"""Process-wide adaptive concurrency and rate limit for DMS requests"""
+
+import logging
+import threading
+import time
+
+
+class AdaptiveLimiter:
+    """
+    Shared limiter for all outbound DMS requests.
+
+    Caps the requests in flight with a window that adapts AIMD style:
+    every fast, successful response widens the window by 1/window, a 429/503
+    response or a latency above latency_target halves it (at most once per
+    latency_target, so a burst of slow responses counts as one congestion signal).
+    Optionally caps the requests per second with a token bucket.
+    """
+
+    THROTTLE_STATUS_CODES = (429, 503)
+
+    def __init__(self, max_in_flight=16, min_in_flight=1, max_rps=0.0,
+                 latency_target=2.0, decrease_factor=0.5):
+        self.max_in_flight = max(max_in_flight, 1)
+        self.min_in_flight = max(min(min_in_flight, self.max_in_flight), 1)
+        self.max_rps = max_rps
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+
+        self.window = float(self.max_in_flight)
+        self.in_flight = 0
+        self._tokens = float(max_rps) if max_rps else 0.0
+        self._last_refill = time.monotonic()
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_config(cls, config):
+        """Create a limiter from the flask app configuration"""
+        return cls(
+            max_in_flight=config["DMS_MAX_IN_FLIGHT"],
+            min_in_flight=config["DMS_MIN_IN_FLIGHT"],
+            max_rps=config["DMS_MAX_RPS"],
+            latency_target=config["DMS_LATENCY_TARGET_MS"] / 1000,
+        )
+
+    def _refill(self, now):
+        """Add the tokens earned since the last refill, caller holds the lock"""
+        if self.max_rps:
+            self._tokens = min(self.max_rps, self._tokens + (now - self._last_refill) * self.max_rps)
+        self._last_refill = now
+
+    def acquire(self):
+        """Block until a slot in the window and, if rate limited, a token is free"""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+
+                if self.in_flight >= int(self.window):
+                    self._condition.wait()
+                    continue
+
+                if self.max_rps and self._tokens < 1:
+                    self._condition.wait((1 - self._tokens) / self.max_rps)
+                    continue
+
+                if self.max_rps:
+                    self._tokens -= 1
+                self.in_flight += 1
+                return
+
+    def release(self, latency, status_code=None):
+        """
+        Free a slot and adapt the window to the observed response.
+
+        Args:
+            latency (float): Duration of the request in seconds
+            status_code (int): HTTP status, None if the request failed without response
+        """
+        logger = logging.getLogger(__name__)
+
+        with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+
+            congested = status_code in self.THROTTLE_STATUS_CODES or latency > self.latency_target
+            if congested:
+                if now - self._last_decrease >= self.latency_target:
+                    old_window = self.window
+                    self.window = max(float(self.min_in_flight), self.window * self.decrease_factor)
+                    self._last_decrease = now
+                    logger.warning(
+                        "DMS congestion (status %s, %.0f ms), window %.1f -> %.1f",
+                        status_code, latency * 1000, old_window, self.window
+                    )
+            elif status_code is not None and status_code < 500:
+                self.window = min(float(self.max_in_flight), self.window + 1 / self.window)
+
+            self._condition.notify_all()
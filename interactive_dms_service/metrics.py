@@ -0,0 +1,145 @@
+"""Request counters and latency histograms in Prometheus text format"""
+
+import threading
+import time
+from flask import current_app, g, request
+
+
+class Metrics:
+    """
+    Thread-safe registry for counters and histograms.
+
+    Counters and histograms are keyed by metric name and a tuple of label pairs.
+    render() returns all series in the Prometheus text exposition format.
+    """
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    HELP = {
+        "dms_requests_total": ("counter", "Requests sent to the DMS"),
+        "dms_errors_total": ("counter", "Failed requests to the DMS by error type"),
+        "dms_request_duration_seconds": ("histogram", "Latency of DMS requests"),
+        "dms_coalesced_total": ("counter", "DMS reads served by an identical call already in flight"),
+        "http_requests_total": ("counter", "Handled flask requests"),
+        "http_errors_total": ("counter", "Failed flask requests by error type"),
+        "http_request_duration_seconds": ("histogram", "Latency of flask routes"),
+    }
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Register the registry and the flask request instrumentation"""
+        app.extensions["dms_metrics"] = self
+        app.before_request(_start_timer)
+        app.after_request(_record_response)
+        app.teardown_request(_record_exception)
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((labels or {}).items()))
+
+    def inc(self, name, labels=None, value=1):
+        """Increase a counter"""
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, labels, seconds):
+        """Add an observation to a histogram"""
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {
+                    "buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0
+                }
+            for idx, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram["buckets"][idx] += 1
+            histogram["sum"] += seconds
+            histogram["count"] += 1
+
+    def track_dms_call(self, endpoint, seconds, error_type=None):
+        """Record one request to the DMS"""
+        labels = {"endpoint": endpoint}
+        self.inc("dms_requests_total", labels)
+        self.observe("dms_request_duration_seconds", labels, seconds)
+        if error_type:
+            self.inc("dms_errors_total", {"endpoint": endpoint, "type": error_type})
+
+    @staticmethod
+    def _format_labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (
+            (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+            for key, value in pairs
+        )
+        return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {
+                key: {"buckets": list(value["buckets"]), "sum": value["sum"], "count": value["count"]}
+                for key, value in self._histograms.items()
+            }
+
+        lines = []
+        for name, (metric_type, help_text) in self.HELP.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+            if metric_type == "counter":
+                for (metric_name, labels), value in sorted(counters.items()):
+                    if metric_name == name:
+                        lines.append(f"{name}{self._format_labels(labels)} {value}")
+                continue
+
+            for (metric_name, labels), histogram in sorted(histograms.items()):
+                if metric_name != name:
+                    continue
+                for bound, count in zip(self.buckets, histogram["buckets"]):
+                    lines.append(f"{name}_bucket{self._format_labels(labels, [('le', bound)])} {count}")
+                lines.append(f"{name}_bucket{self._format_labels(labels, [('le', '+Inf')])} {histogram['count']}")
+                lines.append(f"{name}_sum{self._format_labels(labels)} {histogram['sum']}")
+                lines.append(f"{name}_count{self._format_labels(labels)} {histogram['count']}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _route_label():
+    """Route pattern of the current request, keeps the label cardinality low"""
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+
+def _start_timer():
+    g.metrics_start = time.perf_counter()
+
+
+def _record_response(response):
+    metrics = current_app.extensions["dms_metrics"]
+    started = g.pop("metrics_start", None)
+    route = _route_label()
+
+    metrics.inc("http_requests_total", {"route": route, "method": request.method, "status": str(response.status_code)})
+    if started is not None:
+        metrics.observe("http_request_duration_seconds", {"route": route}, time.perf_counter() - started)
+    if response.status_code >= 500:
+        metrics.inc("http_errors_total", {"route": route, "type": f"http_{response.status_code}"})
+        # an unhandled exception ends up here as 500, teardown must not count it again
+        g.metrics_error_recorded = True
+    return response
+
+
+def _record_exception(exc):
+    # GeneratorExit only means a streamed response was closed early
+    if isinstance(exc, Exception) and not g.pop("metrics_error_recorded", False):
+        metrics = current_app.extensions["dms_metrics"]
+        metrics.inc("http_errors_total", {"route": _route_label(), "type": type(exc).__name__})
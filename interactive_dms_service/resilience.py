@@ -0,0 +1,120 @@
+"""Retry policy and circuit breaker for DMS requests"""
+
+import logging
+import random
+import threading
+import time
+import requests
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without sending a request while the circuit breaker is open"""
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter.
+
+    A request is attempted up to max_attempts times. Before attempt n+1 the
+    caller waits a random time between 0 and min(backoff_max, backoff_base * 2**(n-1)),
+    or the Retry-After of a 429/503 response if that is shorter than backoff_max.
+    """
+
+    RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+    def __init__(self, max_attempts=3, backoff_base=0.5, backoff_max=10.0):
+        self.max_attempts = max(max_attempts, 1)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    @classmethod
+    def from_config(cls, config):
+        """Create a retry policy from the flask app configuration"""
+        return cls(
+            max_attempts=config["DMS_RETRY_ATTEMPTS"],
+            backoff_base=config["DMS_RETRY_BACKOFF_MS"] / 1000,
+            backoff_max=config["DMS_RETRY_BACKOFF_MAX_MS"] / 1000,
+        )
+
+    def should_retry(self, attempt, response=None, error=None):
+        """True if the outcome of attempt (1-based) is transient and attempts are left"""
+        if attempt >= self.max_attempts or isinstance(error, CircuitOpenError):
+            return False
+        if error is not None:
+            return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+        return response is not None and response.status_code in self.RETRY_STATUS_CODES
+
+    def delay(self, attempt, response=None):
+        """Seconds to wait after attempt (1-based) before the next one"""
+        if response is not None:
+            retry_after = response.headers.get("retry-after", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Fail fast while the DMS is down.
+
+    After failure_threshold consecutive failures (connection errors, timeouts,
+    5xx responses) the circuit opens and requests fail immediately with
+    CircuitOpenError. After reset_timeout one probe request is let through,
+    its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_running = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        """Create a circuit breaker from the flask app configuration"""
+        return cls(
+            failure_threshold=config["DMS_BREAKER_THRESHOLD"],
+            reset_timeout=config["DMS_BREAKER_RESET_SECONDS"],
+        )
+
+    def before_request(self):
+        """Raise CircuitOpenError if no request may be sent right now"""
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probe_running:
+                self._probe_running = True
+                return
+            raise CircuitOpenError("DMS circuit breaker is open, request not sent")
+
+    def record_success(self):
+        """Close the circuit after a successful request"""
+        logger = logging.getLogger(__name__)
+
+        with self._lock:
+            if self.state != "closed":
+                logger.info("DMS circuit breaker closed")
+            self.state = "closed"
+            self.failures = 0
+            self._probe_running = False
+
+    def record_failure(self):
+        """Count a failed request, open the circuit at the threshold"""
+        logger = logging.getLogger(__name__)
+
+        with self._lock:
+            self.failures += 1
+            self._probe_running = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.error(
+                        "DMS circuit breaker opened after %d failures, failing fast for %.0f s",
+                        self.failures, self.reset_timeout
+                    )
+                self.state = "open"
+                self._opened_at = time.monotonic()
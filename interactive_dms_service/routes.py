@@ -1,16 +1,47 @@
 """Routes of flask Web App"""
 
+import csv
 import logging
-from flask import Blueprint, current_app, render_template, request, redirect, url_for, session
-from .forms import SearchForm, UpdateForm
+import time
+import unicodedata
+import uuid
+from pathlib import Path
+from urllib.parse import quote
+from flask import Blueprint, Response, current_app, render_template, stream_template, stream_with_context, request, redirect, url_for, session, abort
+from werkzeug.http import dump_options_header
+from .forms import SearchForm, UpdateForm, ExecuteForm, CancelForm, ResumeForm, RollbackForm, UploadForm, SaveSearchForm, RefreshForm
 from .config import Config
-from .dmsapi import call_info, call_search, call_schema, call_objectschema, call_dryrun, call_update
+from .dmsapi import call_info, iter_search, call_schema, call_objectschema, call_dryrun, invalidate_schema_cache
+from .export import export_lines, prefetch_pages, gzip_chunks
+from .journal import UpdateJournal
+from .jobs import get_jobs
+from .store import get_store
+from .schema_index import get_schema_index
+from .saved import get_saved_searches, save_search, refresh_saved_search
+from .tasks import run_search, run_dryrun, create_update_journal, run_update, run_rollback, run_upload
+from .upload import upload_format, read_columns, count_rows, validate_columns
 
 # Create blueprint
 main = Blueprint('main', __name__)
 logger = logging.getLogger(__name__)
 
 
+def get_paging(total):
+    """Current page from the page/size request arguments, clamped to the total row count"""
+    size = request.args.get('size', current_app.config['PAGE_SIZE'], type=int)
+    size = max(1, min(size, current_app.config['PAGE_SIZE_MAX']))
+    pages = max(1, -(-total // size))
+    page = max(1, min(request.args.get('page', 1, type=int), pages))
+    return {'page': page, 'size': size, 'pages': pages, 'total': total, 'offset': (page - 1) * size}
+
+
+def page_url(page):
+    """URL of the current view with another page number"""
+    args = request.args.to_dict()
+    args['page'] = page
+    return url_for(request.endpoint, **(request.view_args or {}), **args)
+
+
 @main.route('/')
 def index():
     """Sitemap of all defined routes"""
@@ -49,6 +80,13 @@ def status_check():
     }
 
 
+@main.route('/metrics')
+def metrics():
+    """Request counters and latency histograms in Prometheus text format"""
+    metrics_text = current_app.extensions["dms_metrics"].render()
+    return Response(metrics_text, mimetype='text/plain; version=0.0.4')
+
+
 @main.route('/info')
 def info():
     """Minimal DMS Endpoint"""
@@ -74,7 +112,7 @@ def search():
     if search_form.errors:
         logger.warning("Form validation errors: %s", search_form.errors)
 
-    return render_template('search.html', form=search_form)
+    return render_template('search.html', form=search_form, object_types=get_schema_index().suggest(limit=1000))
 
 
 @main.route('/result')
@@ -88,56 +126,207 @@ def result():
     query_string = f"Show {arg_field} for {arg_folder} items with {arg_condition}"
     logger.debug("Search Query: %s", query_string)
 
-    search_results = call_search(arg_field, arg_folder, arg_condition)
-    
-    # parse search results
-    parsed_results = {
-        'table_headers': [],
-        'table_rows': [],
-        'objects': []
-    }
-    
-    objects = search_results.get('objects', [])
-    
+    store = get_store()
+    search_meta = {'folder': arg_folder, 'field': arg_field, 'condition': arg_condition}
+
+    # paging through the stored results of the same search reads only the requested slice
+    old_result_id = session.get('search_results_id')
+    if 'page' in request.args and old_result_id:
+        old_meta = store.get_meta(old_result_id)
+        if {key: old_meta.get(key) for key in search_meta} == search_meta:
+            paging = get_paging(store.count(old_result_id))
+            result_rows = (
+                row['values'] for row in store.iter_rows(old_result_id, paging['offset'], paging['size'])
+            )
+            return stream_template(
+                'result.html', result_query=query_string, result_headers=old_meta.get('headers', []),
+                result_count=paging['total'], result_rows=result_rows, paging=paging, page_url=page_url
+            )
+
+    # replace old search results of this session, result sets of saved searches are kept
+    session.pop('search_results_id', None)
+    if old_result_id and not store.get_meta(old_result_id).get('saved'):
+        store.delete(old_result_id)
+
+    search_data = run_search(arg_folder, arg_field, arg_condition)
+    result_id, table_headers, result_count = search_data['result_id'], search_data['headers'], search_data['count']
+
     # handle empty search results
-    if not objects:        
-    
-        # Clear old search results from session data 
-        session.pop('search_results', None)
-        
-        return render_template('result.html', result_query=query_string, result_headers=parsed_results['table_headers'], result_rows=parsed_results['table_rows'] )
-    
-    # use all properties from first object as table headers (exclude system properties)
-    first_obj_properties = objects[0].get('properties', {})
-    parsed_results['table_headers'] = [
-        key for key in first_obj_properties.keys() 
-        if not key.startswith('system:')
-    ]
-    
-    # parse properties from each object in the search results
-    for object in objects:
-        properties = object.get('properties', {})
-        
-        # get objectId and objectTypeId to store search result for later 
-        object_ids = {
-            'objectId': properties.get('system:objectId', {}).get('value'),
-            'objectTypeId': properties.get('system:objectTypeId', {}).get('value'),
-        }
-        parsed_results['objects'].append(object_ids)
-        
-        # Extract non-system properties for table content
-        table_row = {}
-        for key in parsed_results['table_headers']:
-            prop_data = properties.get(key, {})
-            table_row[key] = prop_data.get('value', '')
-        
-        parsed_results['table_rows'].append(table_row)    
-    
-    # Store search results in session for later use
-    session['search_results'] = parsed_results['objects']
-    logger.info("Stored %i result IDs in session", len(parsed_results['objects']))
+    if not result_count:
+        return render_template('result.html', result_query=query_string, result_headers=table_headers, result_count=0, result_rows=[])
+
+    # Store only the handle of the search results in session for later use
+    session['search_results_id'] = result_id
+
+    paging = get_paging(result_count)
+    result_rows = (row['values'] for row in store.iter_rows(result_id, paging['offset'], paging['size']))
             
-    return render_template('result.html', result_query=query_string, result_headers=parsed_results['table_headers'], result_rows=parsed_results['table_rows'] )
+    return stream_template('result.html', result_query=query_string, result_headers=table_headers, result_count=result_count, result_rows=result_rows, paging=paging, page_url=page_url)
+
+
+def _saved_list():
+    """Saved searches with their refresh time formatted for display"""
+    saved_searches = get_saved_searches().list()
+    for saved_search in saved_searches:
+        refreshed = saved_search['refreshed']
+        saved_search['refreshed'] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(refreshed)) if refreshed else ''
+    return saved_searches
+
+
+@main.route('/saved', methods=['GET', 'POST'])
+def saved():
+    """Saved searches, POST saves the current search of the session"""
+
+    save_form = SaveSearchForm()
+    save_error = None
+    outcome = None
+
+    if save_form.validate_on_submit():
+        result_id = session.get('search_results_id')
+        search_meta = get_store().get_meta(result_id) if result_id else {}
+        if not search_meta.get('folder'):
+            save_error = "No search to save, run a search first"
+        else:
+            name = save_form.name.data.strip()
+            outcome = save_search(name, search_meta['folder'], search_meta['field'], search_meta['condition'])
+            if "error" in outcome:
+                save_error = outcome["error"]
+                outcome = None
+            else:
+                outcome['name'] = name
+
+    # Log form validation errors if any
+    if save_form.errors:
+        logger.warning("Form validation errors: %s", save_form.errors)
+
+    return render_template(
+        'saved.html', saved_searches=_saved_list(), form=save_form,
+        refresh_form=RefreshForm(), error=save_error, outcome=outcome
+    )
+
+
+@main.route('/saved/<name>')
+def saved_open(name):
+    """Show the stored results of a saved search and use them as search results of the session"""
+
+    entry = get_saved_searches().get(name)
+    store = get_store()
+    if entry is None or not entry['set_id'] or not store.exists(entry['set_id']):
+        abort(404)
+
+    # replace a temporary search of this session, it is not reachable anymore
+    old_result_id = session.get('search_results_id')
+    if old_result_id and old_result_id != entry['set_id'] and not store.get_meta(old_result_id).get('saved'):
+        store.delete(old_result_id)
+    session['search_results_id'] = entry['set_id']
+
+    query_string = f"Show {entry['field']} for {entry['folder']} items with {entry['condition']} (saved as {name})"
+    paging = get_paging(store.count(entry['set_id']))
+    result_rows = (row['values'] for row in store.iter_rows(entry['set_id'], paging['offset'], paging['size']))
+
+    return stream_template(
+        'result.html', result_query=query_string, result_headers=store.get_meta(entry['set_id']).get('headers', []),
+        result_count=paging['total'], result_rows=result_rows, paging=paging, page_url=page_url
+    )
+
+
+@main.route('/saved/<name>/refresh', methods=['POST'])
+def saved_refresh(name):
+    """Refresh a saved search with the objects modified since its last refresh, or delete it"""
+
+    refresh_form = RefreshForm()
+    refresh_error = None
+    outcome = None
+
+    if not refresh_form.validate_on_submit() or get_saved_searches().get(name) is None:
+        logger.warning("Saved search %s can not be refreshed", name)
+        return redirect(url_for('main.saved'))
+
+    if refresh_form.delete.data:
+        entry = get_saved_searches().delete(name)
+        if entry['set_id']:
+            if session.get('search_results_id') == entry['set_id']:
+                session.pop('search_results_id', None)
+            get_store().delete(entry['set_id'])
+        logger.info("Saved search %s deleted", name)
+        return redirect(url_for('main.saved'))
+
+    outcome = refresh_saved_search(name, full=bool(refresh_form.full.data))
+    if "error" in outcome:
+        refresh_error = outcome["error"]
+        outcome = None
+    else:
+        outcome['name'] = name
+
+    return render_template(
+        'saved.html', saved_searches=_saved_list(), form=SaveSearchForm(formdata=None),
+        refresh_form=refresh_form, error=refresh_error, outcome=outcome
+    )
+
+
+def _attachment_header(filename):
+    """Content-Disposition header for a download, with an ASCII fallback for other file names"""
+    filename = ''.join(c if c.isprintable() and c not in '/\\' else '_' for c in filename)
+    simple = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+    options = {'filename': simple}
+    if simple != filename:
+        options['filename*'] = f"UTF-8''{quote(filename, safe='')}"
+    return dump_options_header('attachment', options)
+
+
+@main.route('/result/export')
+def result_export():
+    """
+    Export search results as CSV or NDJSON (?format=csv|ndjson).
+
+    Takes the same folder/field/condition arguments as /result, without them the
+    search of this session is exported. Rows are streamed page by page straight
+    from the DMS, gzip compressed if the client accepts it. If a page fails
+    after the download has started, the stream is aborted, so the partial
+    file is not mistaken for a complete one.
+    """
+
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return {'error': f"Unsupported export format '{export_format}'"}, 400
+
+    search_meta = {}
+    if 'folder' not in request.args and session.get('search_results_id'):
+        search_meta = get_store().get_meta(session['search_results_id'])
+
+    arg_folder = request.args.get('folder', search_meta.get('folder', ''))
+    arg_field = request.args.get('field', search_meta.get('field', '*'))
+    arg_condition = request.args.get('condition', search_meta.get('condition', '*'))
+    if not arg_folder:
+        return {'error': "No folder given and no search stored for this session"}, 400
+
+    logger.info("Exporting %s for %s items with %s as %s", arg_field, arg_folder, arg_condition, export_format)
+
+    errors = []
+    pages = prefetch_pages(iter_search(arg_field, arg_folder, arg_condition, errors=errors), errors)
+    if pages is None:
+        return {'error': errors[0]}, 502
+
+    def export_chunks():
+        yield from export_lines(
+            pages, export_format, fields=[field.strip() for field in arg_field.split(',') if field.strip() != '*']
+        )
+        if errors:
+            logger.error("Export of %s items aborted: %s", arg_folder, errors[0])
+            # breaks the chunked response, clients see an incomplete download
+            raise RuntimeError(f"Export of {arg_folder} items incomplete: {errors[0]}")
+
+    chunks = export_chunks()
+    headers = {
+        'Content-Disposition': _attachment_header(f"{arg_folder}.{export_format}"),
+        'Vary': 'Accept-Encoding'
+    }
+    if 'gzip' in request.accept_encodings:
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
 
 
 @main.route('/update', methods=['GET', 'POST'])
@@ -145,49 +334,279 @@ def update():
     """Form asking for field to update"""
     
     update_form = UpdateForm()
+    result_id = session.get('search_results_id')
+    object_type = get_store().get_meta(result_id).get('folder') if result_id else None
+    update_form.object_type = object_type
 
     if update_form.validate_on_submit():
         input_field = update_form.field.data.strip()
         input_new_value = update_form.new_value.data.strip()
         logger.info("Update field %s to ", input_field, input_new_value)
 
+        if update_form.preview.data:
+            return redirect(url_for('main.dryrun', field=input_field, new_value=input_new_value, preview=1))
+
         return redirect(url_for('main.dryrun', field=input_field, new_value=input_new_value))
     
     # Log form validation errors if any
     if update_form.errors:
         logger.warning("Form validation errors: %s", update_form.errors)
 
-    if not session.get('search_results'):
+    if not result_id or not get_store().exists(result_id):
         logger.warning("Update is not possible if there are no search results stored for this session.")
         return redirect(url_for('main.index'))
     
         
-    no_of_affected_objects = len(session['search_results'])
+    no_of_affected_objects = get_store().count(result_id)
     logger.info("Update may affect %i objects", no_of_affected_objects)
 
-    return render_template('update.html', amount=no_of_affected_objects, form=update_form)
+    field_names = get_schema_index().suggest(object_type=object_type, limit=1000) if object_type else []
+    return render_template('update.html', amount=no_of_affected_objects, form=update_form, field_names=field_names)
 
 
 @main.route('/dryrun')
 def dryrun():
-    """1. getting the current values for a given field for all items in the stored search results 2. showing how the values will change in an update 3. preparing the payload data for the actual update"""
+    """Start a background dry run: 1. getting the current values for a given field for all items in the stored search results 2. showing how the values will change in an update 3. preparing the payload data for the actual update
+
+    With ?preview=1 only the objects of the requested page are looked up, synchronously and without preparing payloads."""
 
     arg_field = request.args.get('field', '')
     arg_new_value = request.args.get('new_value', '')
 
     update_string = f"Updating {arg_field} to {arg_new_value}"
     
-    search_result_data = session['search_results']
+    result_id = session.get('search_results_id')
+    if not result_id or not get_store().exists(result_id):
+        logger.warning("Dry run is not possible if there are no search results stored for this session.")
+        return redirect(url_for('main.index'))
 
-    dryrun_data = call_dryrun(search_result_data, arg_field, arg_new_value)
-    logger.info("Dryrun '%s' conducted for %i objects", update_string, len(dryrun_data['result_payloads']))
+    if request.args.get('preview'):
+        store = get_store()
+        paging = get_paging(store.count(result_id))
+        dryrun_data = call_dryrun(
+            list(store.iter_rows(result_id, paging['offset'], paging['size'])), arg_field, arg_new_value,
+            object_type=store.get_meta(result_id).get('folder')
+        )
+        if "error" in dryrun_data:
+            return render_template('dryrun.html', update_info=f"{update_string}: {dryrun_data['error']}")
+
+        return render_template(
+            'dryrun.html', update_info=f"Preview: {update_string}", dryrun_summary=dryrun_data['summary'],
+            dryrun_count=paging['total'], update_dryrun=dryrun_data['result_dryrun'], amount=0,
+            paging=paging, page_url=page_url,
+            full_dryrun_url=url_for('main.dryrun', field=arg_field, new_value=arg_new_value)
+        )
+
+    no_of_objects = get_store().count(result_id)
+    job = get_jobs().submit(
+        'dryrun', run_dryrun, result_id, arg_field, arg_new_value,
+        total=no_of_objects, description=update_string
+    )
+    logger.info("Dryrun '%s' submitted for %i objects as job %s", update_string, no_of_objects, job.id)
+
+    return redirect(url_for('main.job_view', job_id=job.id))
+
+
+@main.route('/upload', methods=['GET', 'POST'])
+def upload():
+    """Bulk update from an uploaded CSV/NDJSON file with one value per object"""
+
+    upload_form = UploadForm()
+    upload_error = None
+
+    if upload_form.validate_on_submit():
+        input_folder = upload_form.folder.data.strip()
+        upload_file = upload_form.upload.data
+        file_format = upload_format(upload_file.filename)
+
+        upload_dir = Path(current_app.config['UPLOAD_DIR'])
+        upload_dir.mkdir(parents=True, exist_ok=True)
+        upload_path = upload_dir / f"{uuid.uuid4().hex}.{file_format}"
+        upload_file.save(upload_path)
 
-    # store prepared payloads for the actual update
-    session['update_payloads'] = dryrun_data['result_payloads']
+        try:
+            field_name, object_type_id = validate_columns(read_columns(upload_path, file_format), input_folder)
+            no_of_rows = count_rows(upload_path, file_format)
+        except (ValueError, csv.Error) as e:
+            # UnicodeDecodeError is a ValueError
+            logger.warning("Upload %s rejected: %s", upload_file.filename, e)
+            upload_path.unlink()
+            upload_error = str(e)
+        else:
+            update_string = f"Setting field {field_name} from {upload_file.filename} ({no_of_rows} rows)"
+            job = get_jobs().submit(
+                'dryrun', run_upload, str(upload_path), file_format, input_folder, object_type_id, field_name,
+                total=no_of_rows, description=update_string,
+                # run_upload removes the file, but a job cancelled while queued never runs
+                cleanup=lambda: upload_path.unlink(missing_ok=True)
+            )
+            logger.info("Upload dry run '%s' submitted as job %s", update_string, job.id)
+
+            return redirect(url_for('main.job_view', job_id=job.id))
 
-    return render_template('dryrun.html', update_info=update_string, update_dryrun=dryrun_data['result_dryrun'])
+    # Log form validation errors if any
+    if upload_form.errors:
+        logger.warning("Form validation errors: %s", upload_form.errors)
+
+    return render_template('upload.html', form=upload_form, error=upload_error)
+
+
+@main.route('/execute', methods=['POST'])
+def execute():
+    """Start the actual update with the payloads prepared by the last dry run"""
+
+    execute_form = ExecuteForm()
+    payloads_id = session.get('update_payloads_id')
+
+    if not execute_form.validate_on_submit() or not payloads_id or not get_store().exists(payloads_id):
+        logger.warning("Update is not possible without a confirmed dry run for this session.")
+        return redirect(url_for('main.update'))
+
+    store = get_store()
+    no_of_payloads = store.count(payloads_id)
+
+    journal = create_update_journal(payloads_id)
+
+    update_string = f"Updating {no_of_payloads} objects (run {journal.run_id})"
+    job = get_jobs().submit(
+        'update', run_update, payloads_id, run_id=journal.run_id,
+        total=no_of_payloads, description=update_string, key=f"run:{journal.run_id}"
+    )
+    logger.info("Update of %i objects submitted as job %s", no_of_payloads, job.id)
+
+    return redirect(url_for('main.job_view', job_id=job.id))
 
-    
+
+@main.route('/runs')
+def runs():
+    """Journaled update runs, interrupted runs can be resumed"""
+
+    update_runs = UpdateJournal.list_runs(current_app.config['UPDATE_JOURNAL_DIR'])
+    for update_run in update_runs:
+        update_run['active'] = get_jobs().find_active(f"run:{update_run['run_id']}") is not None
+
+    return render_template('runs.html', update_runs=update_runs, form=ResumeForm(), rollback_form=RollbackForm())
+
+
+@main.route('/runs/<run_id>/resume', methods=['POST'])
+def resume_run(run_id):
+    """Continue an interrupted update run, objects committed in its journal are skipped"""
+
+    resume_form = ResumeForm()
+    journal = UpdateJournal.open(current_app.config['UPDATE_JOURNAL_DIR'], run_id)
+
+    if not resume_form.validate_on_submit() or journal is None:
+        logger.warning("Update run %s can not be resumed", run_id)
+        return redirect(url_for('main.runs'))
+
+    active_job = get_jobs().find_active(f"run:{run_id}")
+    if active_job:
+        logger.warning("Update run %s is still running as job %s", run_id, active_job.id)
+        return redirect(url_for('main.job_view', job_id=active_job.id))
+
+    if journal.state()['finished']:
+        logger.warning("Update run %s is already finished, run can not be resumed", run_id)
+        return redirect(url_for('main.runs'))
+
+    header = journal.header()
+    if not get_store().exists(header['payloads_id']):
+        logger.warning("Payloads of update run %s have expired, run can not be resumed", run_id)
+        return redirect(url_for('main.runs'))
+
+    job = get_jobs().submit(
+        'update', run_update, header['payloads_id'], run_id=run_id,
+        total=header['total'], description=f"Resuming update run {run_id}", key=f"run:{run_id}"
+    )
+    logger.info("Update run %s resumed as job %s", run_id, job.id)
+
+    return redirect(url_for('main.job_view', job_id=job.id))
+
+
+@main.route('/runs/<run_id>/rollback', methods=['POST'])
+def rollback_run(run_id):
+    """Restore the before-values of the objects an update run wrote successfully"""
+
+    rollback_form = RollbackForm()
+    journal = UpdateJournal.open(current_app.config['UPDATE_JOURNAL_DIR'], run_id)
+
+    if not rollback_form.validate_on_submit() or journal is None:
+        logger.warning("Update run %s can not be rolled back", run_id)
+        return redirect(url_for('main.runs'))
+
+    active_job = get_jobs().find_active(f"run:{run_id}") or get_jobs().find_active(f"rollback:{run_id}")
+    if active_job:
+        logger.warning("Update run %s is still busy as job %s", run_id, active_job.id)
+        return redirect(url_for('main.job_view', job_id=active_job.id))
+
+    state = journal.state()
+    if not state['before_image']:
+        logger.warning("Update run %s has no before-image, run can not be rolled back", run_id)
+        return redirect(url_for('main.runs'))
+
+    job = get_jobs().submit(
+        'update', run_rollback, run_id,
+        total=state['committed'], description=f"Rolling back update run {run_id}", key=f"rollback:{run_id}"
+    )
+    logger.info("Rollback of update run %s submitted as job %s", run_id, job.id)
+
+    return redirect(url_for('main.job_view', job_id=job.id))
+
+
+@main.route('/jobs/<job_id>', methods=['GET', 'DELETE'])
+def job_status(job_id):
+    """Status and progress of a background job as JSON, DELETE cancels the job"""
+
+    job = get_jobs().get(job_id)
+    if not job:
+        return {'error': f"Job {job_id} not found"}, 404
+
+    if request.method == 'DELETE':
+        get_jobs().cancel(job_id)
+
+    return job.to_dict()
+
+
+@main.route('/jobs/<job_id>/view', methods=['GET', 'POST'])
+def job_view(job_id):
+    """Progress page of a background job, shows the job result when finished"""
+
+    job = get_jobs().get(job_id)
+    if not job:
+        abort(404)
+
+    cancel_form = CancelForm()
+    if cancel_form.validate_on_submit():
+        get_jobs().cancel(job_id)
+        return redirect(url_for('main.job_view', job_id=job_id))
+
+    # the result is only set once the job has finished
+    job_error = (job.result or {}).get('error')
+    if job.status != 'finished' or (job.kind == 'dryrun' and job_error):
+        job_data = job.to_dict()
+        job_data['error'] = job_data['error'] or job_error
+        return render_template('job.html', job=job_data, form=cancel_form)
+
+    store = get_store()
+
+    if job.kind == 'dryrun':
+        # keep the handle of the prepared payloads for the actual update
+        session['update_payloads_id'] = job.result['payloads_id']
+
+        paging = get_paging(job.result['dryrun_count'])
+        return stream_template(
+            'dryrun.html', update_info=job.description, dryrun_summary=job.result['summary'],
+            dryrun_count=job.result['dryrun_count'],
+            update_dryrun=store.iter_rows(job.result['dryrun_id'], paging['offset'], paging['size']),
+            amount=job.result['payloads_count'], form=ExecuteForm(), paging=paging, page_url=page_url
+        )
+
+    paging = get_paging(store.count(job.result['results_id']))
+    return stream_template(
+        'updateresult.html', update_info=job.description, run_id=job.result['run_id'],
+        update_summary=job.result['summary'],
+        update_results=store.iter_rows(job.result['results_id'], paging['offset'], paging['size']),
+        form=RollbackForm(), paging=paging, page_url=page_url
+    )
 
 
 @main.route('/schema')
@@ -211,9 +630,29 @@ def schema():
     logger.debug("Schema contains %d object types", len(object_types))
     
     return render_template('schema.html', result_json=object_types)
-    
 
 
+@main.route('/schema/invalidate', methods=['POST'])
+def schema_invalidate():
+    """Drop cached schema data, optionally only for one ObjectType (?objecttype_id=...)"""
+
+    arg_objecttype_id = request.args.get('objecttype_id')
+    dropped = invalidate_schema_cache(arg_objecttype_id)
+    get_schema_index().invalidate()
+
+    return {'invalidated': dropped}
+
+
+@main.route('/schema/suggest')
+def schema_suggest():
+    """Autocomplete as JSON: object type names, or field names with ?folder=... (prefix in ?q=...)"""
+
+    arg_folder = request.args.get('folder', '').strip()
+    arg_prefix = request.args.get('q', '').strip()
+    limit = min(request.args.get('limit', 20, type=int), 1000)
+
+    return {'suggestions': get_schema_index().suggest(arg_prefix, object_type=arg_folder or None, limit=limit)}
+
 
 @main.route('/objectschema/<objecttype_id>')
 def object_schema(objecttype_id):
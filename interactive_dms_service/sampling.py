@@ -0,0 +1,38 @@
+"""Sampling of per-object log records in bulk operations"""
+
+import threading
+
+
+class LogSampler:
+    """
+    Log only every n-th of many similar per-object records.
+
+    The first record is always logged, then every n-th one; every=0 drops all
+    of them, every=1 logs all. Suppressed records are counted and reported in
+    one line by flush, the per-object outcomes stay in the result store and
+    the update journal.
+    """
+
+    def __init__(self, logger, every=100):
+        self.logger = logger
+        self.every = every
+        self.seen = 0
+        self.suppressed = 0
+        self._lock = threading.Lock()
+
+    def log(self, level, msg, *args):
+        """Log the record if it is due, otherwise only count it"""
+        with self._lock:
+            self.seen += 1
+            due = self.every > 0 and (self.seen - 1) % self.every == 0
+            if not due:
+                self.suppressed += 1
+        if due:
+            self.logger.log(level, msg, *args, stacklevel=2)
+
+    def flush(self, description):
+        """Log the number of suppressed records once and reset the counters"""
+        with self._lock:
+            suppressed, self.suppressed, self.seen = self.suppressed, 0, 0
+        if suppressed:
+            self.logger.info("%s: %d similar per-object log records not logged", description, suppressed)
@@ -0,0 +1,225 @@
+"""Saved searches with incremental refresh on the modification timestamp"""
+
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from flask import current_app
+from .dmsapi import iter_search
+from .store import get_store
+
+MODIFIED_FIELD = "system:lastModificationDate"
+
+
+def get_saved_searches():
+    """Return the app-scoped SavedSearches created in create_app"""
+    return current_app.extensions["dms_saved_searches"]
+
+
+class SavedSearches:
+    """
+    Catalog of saved searches next to the result store.
+
+    Each saved search keeps its query, the id of its result set (which does
+    not expire) and the high-water mark: the latest system:lastModificationDate
+    seen in its objects. A refresh only asks the DMS for objects modified
+    since that mark and merges them into the result set by objectId.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS saved_searches (
+                    name TEXT PRIMARY KEY,
+                    folder TEXT NOT NULL,
+                    field TEXT NOT NULL,
+                    condition TEXT NOT NULL,
+                    set_id TEXT,
+                    high_water TEXT,
+                    created REAL NOT NULL,
+                    refreshed REAL
+                )
+                """
+            )
+        connection.close()
+
+    @classmethod
+    def from_config(cls, config):
+        """Create the catalog in the database file of the result store"""
+        return cls(config["RESULT_STORE_PATH"])
+
+    def _connect(self):
+        """Open a new connection, each thread uses its own"""
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def get(self, name):
+        """Saved search as dict, None if it does not exist"""
+        connection = self._connect()
+        try:
+            row = connection.execute("SELECT * FROM saved_searches WHERE name = ?", (name,)).fetchone()
+            return dict(row) if row else None
+        finally:
+            connection.close()
+
+    def list(self):
+        """All saved searches ordered by name"""
+        connection = self._connect()
+        try:
+            return [dict(row) for row in connection.execute("SELECT * FROM saved_searches ORDER BY name")]
+        finally:
+            connection.close()
+
+    def put(self, entry):
+        """Insert or replace a saved search"""
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO saved_searches "
+                "(name, folder, field, condition, set_id, high_water, created, refreshed) "
+                "VALUES (:name, :folder, :field, :condition, :set_id, :high_water, :created, :refreshed)",
+                entry
+            )
+        connection.close()
+
+    def delete(self, name):
+        """Remove a saved search, returns its entry or None"""
+        entry = self.get(name)
+        if entry:
+            connection = self._connect()
+            with connection:
+                connection.execute("DELETE FROM saved_searches WHERE name = ?", (name,))
+            connection.close()
+        return entry
+
+
+def save_search(name, folder, field, condition):
+    """
+    Save a search under name and load its full result set.
+
+    A saved search of the same name is replaced, or kept if loading fails.
+
+    Returns:
+        dict: see refresh_saved_search
+    """
+    saved = get_saved_searches()
+    previous = saved.get(name)
+    saved.put({
+        "name": name, "folder": folder, "field": field, "condition": condition,
+        # the full refresh deletes the previous result set once the new one is complete
+        "set_id": previous["set_id"] if previous else None,
+        "high_water": None, "created": time.time(), "refreshed": None
+    })
+
+    outcome = refresh_saved_search(name, full=True)
+    if "error" in outcome:
+        if previous:
+            saved.put(previous)
+        else:
+            saved.delete(name)
+    return outcome
+
+
+def refresh_saved_search(name, full=False):
+    """
+    Bring the result set of a saved search up to date.
+
+    Without a high-water mark or with full=True the whole query runs again
+    into a new result set. Otherwise only objects modified at or after the
+    mark are requested and merged into the stored set by objectId. Objects
+    deleted in the DMS or no longer matching the condition stay in the set
+    until the next full refresh. The mark only moves if every page was received.
+
+    Returns:
+        dict: 'set_id', 'fetched', 'inserted', 'updated', 'count' and 'high_water',
+              or 'error'
+    """
+    logger = logging.getLogger(__name__)
+
+    saved = get_saved_searches()
+    store = get_store()
+    entry = saved.get(name)
+    if entry is None:
+        return {"error": f"Saved search '{name}' not found"}
+
+    delta = not full and entry["high_water"] and entry["set_id"] and store.exists(entry["set_id"])
+    condition = entry["condition"]
+    if delta:
+        modified_clause = f"{MODIFIED_FIELD} >= '{entry['high_water']}'"
+        condition = modified_clause if condition.strip() in ("", "*") else f"({condition}) AND {modified_clause}"
+        set_id = entry["set_id"]
+        headers = store.get_meta(set_id).get("headers", [])
+    else:
+        set_id = store.create(
+            "search",
+            {"folder": entry["folder"], "field": entry["field"], "condition": entry["condition"], "saved": name},
+            ttl_minutes=0
+        )
+        headers = []
+
+    field = entry["field"]
+    if field.strip() != "*" and MODIFIED_FIELD not in field:
+        field = f"{field}, {MODIFIED_FIELD}"
+
+    high_water = entry["high_water"] if delta else None
+    fetched = inserted = updated = 0
+    errors = []
+
+    for objects in iter_search(field, entry["folder"], condition, use_cache=False, errors=errors):
+        if not headers:
+            headers = [
+                key for key in objects[0].get("properties", {}).keys()
+                if not key.startswith("system:")
+            ]
+
+        rows = []
+        for dms_object in objects:
+            properties = dms_object.get("properties", {})
+            modified = properties.get(MODIFIED_FIELD, {}).get("value")
+            if modified and (high_water is None or str(modified) > high_water):
+                high_water = str(modified)
+            rows.append({
+                "objectId": properties.get("system:objectId", {}).get("value"),
+                "objectTypeId": properties.get("system:objectTypeId", {}).get("value"),
+                "values": {key: properties.get(key, {}).get("value", "") for key in headers}
+            })
+
+        page_inserted, page_updated = store.merge(set_id, rows, "objectId")
+        fetched += len(rows)
+        inserted += page_inserted
+        updated += page_updated
+
+    if errors:
+        logger.error("Refresh of saved search '%s' failed: %s", name, errors[0])
+        if not delta:
+            store.delete(set_id)
+        return {"error": errors[0]}
+
+    store.update_meta(set_id, headers=headers)
+    if not delta and entry["set_id"]:
+        store.delete(entry["set_id"])
+
+    entry.update(set_id=set_id, high_water=high_water, refreshed=time.time())
+    saved.put(entry)
+
+    count = store.count(set_id)
+    logger.info(
+        "Saved search '%s' refreshed (%s): %d fetched, %d new, %d updated, %d in total",
+        name, "delta" if delta else "full", fetched, inserted, updated, count
+    )
+
+    return {
+        "set_id": set_id,
+        "fetched": fetched,
+        "inserted": inserted,
+        "updated": updated,
+        "count": count,
+        "high_water": high_water,
+        "delta": bool(delta)
+    }
@@ -0,0 +1,170 @@
+"""Local index of object types and fields for validation and autocomplete"""
+
+import logging
+import threading
+import time
+from flask import current_app
+from .dmsapi import call_schema, call_objectschema
+
+
+def get_schema_index():
+    """Return the app-scoped SchemaIndex created in create_app"""
+    return current_app.extensions["dms_schema_index"]
+
+
+class SchemaIndex:
+    """
+    Dictionaries of object type names, their fields and property types.
+
+    The object types are loaded from call_schema on first use, the fields of an
+    object type from call_objectschema when that type is first checked. Both
+    go through the schema cache. After refresh_seconds the index is rebuilt in
+    a background thread, callers keep using the previous index meanwhile.
+
+    If the DMS can not be reached, the index is unavailable and all checks
+    pass, so validation never blocks a request the DMS itself might accept.
+    """
+
+    def __init__(self, app, refresh_seconds=900):
+        self.app = app
+        self.refresh_seconds = refresh_seconds
+        self._object_types = None
+        self._fields = {}
+        self._built = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, app):
+        """Create a schema index from the flask app configuration"""
+        return cls(app, refresh_seconds=app.config["SCHEMA_INDEX_REFRESH_SECONDS"])
+
+    def _load_object_types(self):
+        """Object types by internal name from the full schema, None if not available"""
+        logger = logging.getLogger(__name__)
+
+        schema_data = call_schema()
+        if "error" in schema_data:
+            logger.warning("Schema index not available: %s", schema_data["error"])
+            return None
+        return {
+            obj.get("localName"): {"id": obj.get("id"), "displayName": obj.get("displayName")}
+            for obj in schema_data.get("objectTypes", []) if obj.get("localName")
+        }
+
+    def _load_fields(self, object_type_id):
+        """Property types by internal field name of an object type, None if not available"""
+        object_schema_data = call_objectschema(object_type_id)
+        if "error" in object_schema_data:
+            return None
+        return {
+            field_object.get("localName"): field_object.get("propertyType")
+            for field_object in object_schema_data.get("fields", [])
+            if field_object.get("localName") and field_object.get("propertyType") != "static"
+        }
+
+    def _rebuild(self):
+        """Reload the object types and the fields of all types loaded so far"""
+        logger = logging.getLogger(__name__)
+
+        try:
+            with self.app.app_context():
+                object_types = self._load_object_types()
+                if object_types is None:
+                    # keep the previous index and try again after the next interval
+                    with self._lock:
+                        self._built = time.monotonic()
+                    return
+                fields = {}
+                for name in list(self._fields):
+                    if name in object_types:
+                        loaded = self._load_fields(object_types[name]["id"])
+                        if loaded is not None:
+                            fields[name] = loaded
+            with self._lock:
+                self._object_types, self._fields, self._built = object_types, fields, time.monotonic()
+            logger.info("Schema index rebuilt: %d object types", len(object_types))
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _current(self):
+        """The object types, loading them on first use and refreshing them in the background when due"""
+        with self._lock:
+            object_types = self._object_types
+            due = time.monotonic() - self._built >= self.refresh_seconds
+            start_refresh = object_types is not None and due and not self._refreshing
+            if start_refresh:
+                self._refreshing = True
+
+        if object_types is None:
+            object_types = self._load_object_types()
+            if object_types is not None:
+                with self._lock:
+                    self._object_types, self._built = object_types, time.monotonic()
+        elif start_refresh:
+            threading.Thread(target=self._rebuild, name="schema-index", daemon=True).start()
+        return object_types
+
+    def fields(self, object_type):
+        """Property types by field name of object_type, None if unknown or not available"""
+        object_types = self._current()
+        if not object_types or object_type not in object_types:
+            return None
+
+        with self._lock:
+            fields = self._fields.get(object_type)
+        if fields is None:
+            fields = self._load_fields(object_types[object_type]["id"])
+            if fields is not None:
+                with self._lock:
+                    self._fields[object_type] = fields
+        return fields
+
+    def object_type_id(self, object_type):
+        """Id of an object type by internal name, None if unknown or not available"""
+        object_types = self._current()
+        if not object_types or object_type not in object_types:
+            return None
+        return object_types[object_type]["id"]
+
+    def check(self, object_type, field_names=()):
+        """
+        Check an object type name and field names against the index.
+
+        Field names '*' and system properties are not checked.
+
+        Returns:
+            str: Error message for the user, None if valid or the index is not available
+        """
+        object_types = self._current()
+        if object_types is None:
+            return None
+        if object_type not in object_types:
+            return f"Object type '{object_type}' does not exist"
+
+        fields = self.fields(object_type)
+        if fields is None:
+            return None
+        for field_name in field_names:
+            if field_name == "*" or field_name.startswith("system:"):
+                continue
+            if field_name not in fields:
+                return f"Field '{field_name}' does not exist in object type '{object_type}'"
+        return None
+
+    def suggest(self, prefix="", object_type=None, limit=20):
+        """Object type names or, with object_type, field names starting with prefix"""
+        if object_type:
+            names = self.fields(object_type) or {}
+        else:
+            names = self._current() or {}
+        prefix = prefix.lower()
+        return sorted(name for name in names if name.lower().startswith(prefix))[:limit]
+
+    def invalidate(self):
+        """Drop the index, it is loaded again on next use"""
+        with self._lock:
+            self._object_types = None
+            self._fields = {}
+            self._built = 0.0
@@ -0,0 +1,172 @@
+"""SQLite backed server-side sessions for Flask-Session"""
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from flask_session.base import ServerSideSession, ServerSideSessionInterface
+from flask_session.defaults import Defaults
+
+
+class SQLiteSession(ServerSideSession):
+    """Session stored in the SQLite session table"""
+
+
+class SQLiteSessionInterface(ServerSideSessionInterface):
+    """
+    Flask-Session interface storing sessions in a single SQLite file.
+
+    Sessions are rows with an indexed expiry timestamp, so loading a session
+    is one primary key lookup and expired sessions are found without scanning.
+    The database runs in WAL mode with a busy timeout, which makes it safe to
+    share between several worker processes on one host. A daemon thread deletes
+    expired sessions every cleanup_seconds in batches of cleanup_batch rows,
+    so no request pays for the cleanup.
+    """
+
+    session_class = SQLiteSession
+    # expiry is handled by the cleanup thread, not by the base class
+    ttl = True
+
+    def __init__(self, app, path, key_prefix=Defaults.SESSION_KEY_PREFIX,
+                 use_signer=Defaults.SESSION_USE_SIGNER, permanent=Defaults.SESSION_PERMANENT,
+                 sid_length=Defaults.SESSION_ID_LENGTH,
+                 serialization_format=Defaults.SESSION_SERIALIZATION_FORMAT,
+                 cleanup_seconds=300, cleanup_batch=500):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        self.cleanup_batch = cleanup_batch
+
+        connection = self._connect()
+        with connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    expiry REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS sessions_expiry ON sessions (expiry);
+                """
+            )
+        connection.close()
+
+        super().__init__(
+            app, key_prefix=key_prefix, use_signer=use_signer, permanent=permanent,
+            sid_length=sid_length, serialization_format=serialization_format
+        )
+
+        self._stop = threading.Event()
+        if cleanup_seconds > 0:
+            threading.Thread(
+                target=self._cleanup_loop, args=(cleanup_seconds,), name="session-cleanup", daemon=True
+            ).start()
+
+    @classmethod
+    def from_config(cls, app):
+        """Create the session interface from the flask app configuration"""
+        config = app.config
+        return cls(
+            app,
+            config["SESSION_SQLITE_PATH"],
+            key_prefix=config["SESSION_KEY_PREFIX"],
+            use_signer=config["SESSION_USE_SIGNER"],
+            permanent=config["SESSION_PERMANENT"],
+            sid_length=config.get("SESSION_ID_LENGTH", Defaults.SESSION_ID_LENGTH),
+            serialization_format=config.get("SESSION_SERIALIZATION_FORMAT", Defaults.SESSION_SERIALIZATION_FORMAT),
+            cleanup_seconds=config["SESSION_CLEANUP_SECONDS"],
+            cleanup_batch=config["SESSION_CLEANUP_BATCH"],
+        )
+
+    def _connect(self):
+        """Open a new connection, each thread uses its own"""
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _retrieve_session_data(self, store_id):
+        """Data of a stored session that has not expired, or None"""
+        logger = logging.getLogger(__name__)
+
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT data FROM sessions WHERE id = ? AND expiry > ?", (store_id, time.time())
+            ).fetchone()
+        finally:
+            connection.close()
+
+        if row is None:
+            return None
+        try:
+            return self.serializer.decode(row[0])
+        except Exception:
+            logger.warning("Discarding undecodable session data")
+            return None
+
+    def _delete_session(self, store_id):
+        """Delete a stored session"""
+        connection = self._connect()
+        with connection:
+            connection.execute("DELETE FROM sessions WHERE id = ?", (store_id,))
+        connection.close()
+
+    def _upsert_session(self, session_lifetime, session, store_id):
+        """Insert or replace a session and move its expiry"""
+        expiry = time.time() + session_lifetime.total_seconds()
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                "INSERT INTO sessions (id, data, expiry) VALUES (?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET data = excluded.data, expiry = excluded.expiry",
+                (store_id, self.serializer.encode(session), expiry)
+            )
+        connection.close()
+
+    def _delete_expired_sessions(self):
+        """
+        Delete expired sessions in batches of cleanup_batch rows.
+
+        Every batch is its own short transaction, so writers in other threads
+        and processes are blocked for one batch at most.
+
+        Returns:
+            int: Number of deleted sessions
+        """
+        logger = logging.getLogger(__name__)
+
+        deleted = 0
+        connection = self._connect()
+        try:
+            while True:
+                with connection:
+                    cursor = connection.execute(
+                        "DELETE FROM sessions WHERE rowid IN "
+                        "(SELECT rowid FROM sessions WHERE expiry <= ? LIMIT ?)",
+                        (time.time(), self.cleanup_batch)
+                    )
+                deleted += cursor.rowcount
+                if cursor.rowcount < self.cleanup_batch:
+                    break
+        finally:
+            connection.close()
+
+        if deleted:
+            logger.info("%d expired sessions deleted", deleted)
+        return deleted
+
+    def _cleanup_loop(self, interval):
+        """Background thread deleting expired sessions every interval seconds"""
+        logger = logging.getLogger(__name__)
+
+        while not self._stop.wait(interval):
+            try:
+                self._delete_expired_sessions()
+            except sqlite3.Error as e:
+                logger.warning("Session cleanup failed: %s", e)
+
+    def close(self):
+        """Stop the cleanup thread"""
+        self._stop.set()
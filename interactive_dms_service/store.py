@@ -0,0 +1,286 @@
+"""Server-side store for search results, dry run previews and update payloads"""
+
+import json
+import logging
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from flask import current_app
+
+
+class ResultStore:
+    """
+    SQLite backed store for result sets.
+
+    A result set is an ordered list of JSON rows keyed by a result set id.
+    Sessions only keep that id, routes stream the rows from here.
+    Result sets expire after ttl_minutes and are purged on the next create.
+    Rows merged with a key (see merge) can later be replaced in place.
+    """
+
+    def __init__(self, path, ttl_minutes=120):
+        self.path = Path(path)
+        self.ttl = ttl_minutes * 60
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS result_sets (
+                    set_id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    meta TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    expires REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS result_sets_expires ON result_sets (expires);
+                CREATE TABLE IF NOT EXISTS result_rows (
+                    set_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (set_id, seq)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS result_keys (
+                    set_id TEXT NOT NULL,
+                    row_key TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    PRIMARY KEY (set_id, row_key)
+                ) WITHOUT ROWID;
+                """
+            )
+        connection.close()
+
+    @classmethod
+    def from_config(cls, config):
+        """Create a result store from the flask app configuration"""
+        return cls(config["RESULT_STORE_PATH"], ttl_minutes=config["RESULT_STORE_TTL_MINUTES"])
+
+    def _connect(self):
+        """Open a new connection, each thread and generator uses its own"""
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def create(self, kind, meta=None, ttl_minutes=None):
+        """
+        Create an empty result set.
+
+        Args:
+            ttl_minutes (int): Lifetime of this result set, defaults to the store TTL,
+                               0 keeps the result set until it is deleted
+
+        Returns:
+            str: id of the new result set
+        """
+        logger = logging.getLogger(__name__)
+
+        self.purge_expired()
+
+        set_id = uuid.uuid4().hex
+        now = time.time()
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                "INSERT INTO result_sets (set_id, kind, meta, created, expires) VALUES (?, ?, ?, ?, ?)",
+                (set_id, kind, json.dumps(meta or {}), now, self._expires(now, ttl_minutes))
+            )
+        connection.close()
+
+        logger.debug("Result set %s (%s) created", set_id, kind)
+        return set_id
+
+    def _expires(self, now, ttl_minutes):
+        """Expiry timestamp for ttl_minutes from now, see create"""
+        if ttl_minutes is None:
+            return now + self.ttl
+        return now + ttl_minutes * 60 if ttl_minutes else float("inf")
+
+    def set_ttl(self, set_id, ttl_minutes=None):
+        """
+        Set the remaining lifetime of an existing result set, counted from now.
+
+        Args:
+            ttl_minutes (int): See create, 0 pins the result set until it is deleted
+        """
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                "UPDATE result_sets SET expires = ? WHERE set_id = ?",
+                (self._expires(time.time(), ttl_minutes), set_id)
+            )
+        connection.close()
+
+    def append(self, set_id, rows):
+        """
+        Append rows to a result set, keeping their order.
+
+        Returns:
+            int: Number of appended rows
+        """
+        connection = self._connect()
+        with connection:
+            next_seq = connection.execute(
+                "SELECT COALESCE(MAX(seq), -1) + 1 FROM result_rows WHERE set_id = ?", (set_id,)
+            ).fetchone()[0]
+            cursor = connection.executemany(
+                "INSERT INTO result_rows (set_id, seq, data) VALUES (?, ?, ?)",
+                (
+                    (set_id, seq, json.dumps(row))
+                    for seq, row in enumerate(rows, start=next_seq)
+                )
+            )
+            appended = cursor.rowcount
+        connection.close()
+        return appended
+
+    def merge(self, set_id, rows, key):
+        """
+        Insert or replace rows by the value of their key field.
+
+        A row whose key is already in the result set replaces the stored row
+        at its position, new keys are appended.
+
+        Returns:
+            tuple: (inserted, updated) row counts
+        """
+        inserted = 0
+        updated = 0
+        connection = self._connect()
+        with connection:
+            next_seq = connection.execute(
+                "SELECT COALESCE(MAX(seq), -1) + 1 FROM result_rows WHERE set_id = ?", (set_id,)
+            ).fetchone()[0]
+            for row in rows:
+                row_key = str(row[key])
+                found = connection.execute(
+                    "SELECT seq FROM result_keys WHERE set_id = ? AND row_key = ?", (set_id, row_key)
+                ).fetchone()
+                if found:
+                    connection.execute(
+                        "UPDATE result_rows SET data = ? WHERE set_id = ? AND seq = ?",
+                        (json.dumps(row), set_id, found[0])
+                    )
+                    updated += 1
+                else:
+                    connection.execute(
+                        "INSERT INTO result_rows (set_id, seq, data) VALUES (?, ?, ?)",
+                        (set_id, next_seq, json.dumps(row))
+                    )
+                    connection.execute(
+                        "INSERT INTO result_keys (set_id, row_key, seq) VALUES (?, ?, ?)",
+                        (set_id, row_key, next_seq)
+                    )
+                    next_seq += 1
+                    inserted += 1
+        connection.close()
+        return inserted, updated
+
+    def iter_rows(self, set_id, offset=0, limit=None, batch_size=500):
+        """
+        Generator streaming the rows of a result set in order.
+
+        Args:
+            offset (int): Number of rows to skip
+            limit (int): Maximum number of rows, None for all
+            batch_size (int): Rows fetched from SQLite per round trip
+        """
+        connection = self._connect()
+        try:
+            cursor = connection.execute(
+                "SELECT data FROM result_rows WHERE set_id = ? ORDER BY seq LIMIT ? OFFSET ?",
+                (set_id, -1 if limit is None else limit, offset)
+            )
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                for (data,) in batch:
+                    yield json.loads(data)
+        finally:
+            connection.close()
+
+    def count(self, set_id):
+        """Number of rows in a result set"""
+        connection = self._connect()
+        try:
+            return connection.execute(
+                "SELECT COUNT(*) FROM result_rows WHERE set_id = ?", (set_id,)
+            ).fetchone()[0]
+        finally:
+            connection.close()
+
+    def exists(self, set_id):
+        """True if the result set exists and has not expired"""
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT 1 FROM result_sets WHERE set_id = ? AND expires > ?", (set_id, time.time())
+            ).fetchone()
+            return row is not None
+        finally:
+            connection.close()
+
+    def get_meta(self, set_id):
+        """Metadata of a result set, empty dict if it does not exist"""
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT meta FROM result_sets WHERE set_id = ?", (set_id,)
+            ).fetchone()
+            return json.loads(row[0]) if row else {}
+        finally:
+            connection.close()
+
+    def update_meta(self, set_id, **values):
+        """Merge values into the metadata of a result set"""
+        meta = self.get_meta(set_id)
+        meta.update(values)
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                "UPDATE result_sets SET meta = ? WHERE set_id = ?", (json.dumps(meta), set_id)
+            )
+        connection.close()
+        return meta
+
+    def delete(self, set_id):
+        """Remove a result set and its rows"""
+        connection = self._connect()
+        with connection:
+            connection.execute("DELETE FROM result_rows WHERE set_id = ?", (set_id,))
+            connection.execute("DELETE FROM result_keys WHERE set_id = ?", (set_id,))
+            connection.execute("DELETE FROM result_sets WHERE set_id = ?", (set_id,))
+        connection.close()
+
+    def purge_expired(self):
+        """
+        Remove all expired result sets.
+
+        Returns:
+            int: Number of removed result sets
+        """
+        logger = logging.getLogger(__name__)
+
+        connection = self._connect()
+        with connection:
+            expired = [
+                set_id for (set_id,) in connection.execute(
+                    "SELECT set_id FROM result_sets WHERE expires <= ?", (time.time(),)
+                )
+            ]
+            for set_id in expired:
+                connection.execute("DELETE FROM result_rows WHERE set_id = ?", (set_id,))
+                connection.execute("DELETE FROM result_keys WHERE set_id = ?", (set_id,))
+                connection.execute("DELETE FROM result_sets WHERE set_id = ?", (set_id,))
+        connection.close()
+
+        if expired:
+            logger.info("Purged %d expired result sets", len(expired))
+        return len(expired)
+
+
+def get_store():
+    """Return the app-scoped ResultStore created in create_app"""
+    return current_app.extensions["dms_results"]
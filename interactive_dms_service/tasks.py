@@ -0,0 +1,334 @@
+"""Background job functions combining dmsapi calls with the result store"""
+
+import logging
+import os
+from itertools import islice
+from flask import current_app
+from .dmsapi import iter_search, call_dryrun, call_update
+from .journal import UpdateJournal
+from .store import get_store
+from .upload import iter_upload
+
+
+def _create_dryrun_sets(store, meta):
+    """Create the preview, before-image and payloads result sets of a dry run"""
+    before_id = store.create("before", meta)
+    return {
+        "dryrun_id": store.create("dryrun", meta),
+        "before_id": before_id,
+        "payloads_id": store.create("payloads", {**meta, "before_id": before_id})
+    }
+
+
+def _append_dryrun(store, set_ids, dryrun_data):
+    """Append the output of call_dryrun to the result sets of _create_dryrun_sets"""
+    store.append(set_ids["dryrun_id"], dryrun_data["result_dryrun"])
+
+    # compact before-image of the objects to change, kept for a later rollback
+    store.append(set_ids["before_id"], (
+        {
+            "objectId": item["object_id"],
+            "objectTypeId": item["object_type_id"],
+            "field": item["field"],
+            "value": item["current_value"]
+        }
+        for item in dryrun_data["result_dryrun"] if item.get("change") == "changed"
+    ))
+
+    store.append(set_ids["payloads_id"], dryrun_data["result_payloads"])
+
+
+def run_search(folder, field, condition, progress=None):
+    """
+    Run a search and store all result objects as a new result set.
+
+    Rows keep objectId and objectTypeId for later dry runs plus the values of
+    the non-system properties of the first object, which become the headers.
+
+    Returns:
+        dict: 'result_id' (None if nothing was found), 'count' and 'headers'
+    """
+    logger = logging.getLogger(__name__)
+
+    store = get_store()
+    result_id = store.create("search", {"folder": folder, "field": field, "condition": condition})
+    headers = []
+    count = 0
+
+    # consume the search result page by page and write it to the result store
+    for objects in iter_search(field, folder, condition):
+
+        # use all properties from first object as table headers (exclude system properties)
+        if not headers:
+            headers = [
+                key for key in objects[0].get("properties", {}).keys()
+                if not key.startswith("system:")
+            ]
+
+        result_rows = []
+        for dms_object in objects:
+            properties = dms_object.get("properties", {})
+            result_rows.append({
+                "objectId": properties.get("system:objectId", {}).get("value"),
+                "objectTypeId": properties.get("system:objectTypeId", {}).get("value"),
+                "values": {key: properties.get(key, {}).get("value", "") for key in headers}
+            })
+
+        count += store.append(result_id, result_rows)
+        if progress:
+            progress(len(result_rows))
+
+    if not count:
+        store.delete(result_id)
+        return {"result_id": None, "count": 0, "headers": headers}
+
+    store.update_meta(result_id, headers=headers)
+    logger.info("Stored %i results as result set %s", count, result_id)
+
+    return {"result_id": result_id, "count": count, "headers": headers}
+
+
+def run_dryrun(search_set_id, field_name, new_value, progress=None):
+    """
+    Dry run over a stored search result.
+
+    Streams the objects from the result store into call_dryrun and stores
+    the preview rows and the prepared update payloads as new result sets.
+
+    Returns:
+        dict: 'dryrun_id' and 'payloads_id' result set ids with row counts,
+              or 'error' if the dry run could not be started
+    """
+    logger = logging.getLogger(__name__)
+
+    store = get_store()
+    search_meta = store.get_meta(search_set_id)
+    dryrun_data = call_dryrun(
+        store.iter_rows(search_set_id), field_name, new_value,
+        progress=progress, object_type=search_meta.get("folder")
+    )
+    if "error" in dryrun_data:
+        return {"error": dryrun_data["error"]}
+
+    set_ids = _create_dryrun_sets(
+        store, {"field": field_name, "new_value": new_value, "search_set_id": search_set_id}
+    )
+    _append_dryrun(store, set_ids, dryrun_data)
+
+    logger.info(
+        "Dry run stored as result sets %s (preview) and %s (payloads)",
+        set_ids["dryrun_id"], set_ids["payloads_id"]
+    )
+
+    return {
+        "summary": dryrun_data["summary"],
+        "dryrun_id": set_ids["dryrun_id"],
+        "dryrun_count": len(dryrun_data["result_dryrun"]),
+        "payloads_id": set_ids["payloads_id"],
+        "payloads_count": len(dryrun_data["result_payloads"])
+    }
+
+
+def run_upload(path, file_format, object_type, object_type_id, field_name, progress=None):
+    """
+    Dry run over an uploaded bulk update file with per-object values.
+
+    The file is parsed as a stream and processed in chunks of UPLOAD_CHUNK_ROWS
+    rows, every chunk passes call_dryrun and is appended to the result sets
+    right away, so memory stays bounded by the chunk size. Rows without
+    objectId are counted as failed. Rows without a value for the field (key
+    missing or null) are reported as missing_field, never written as null.
+    The uploaded file is removed afterwards.
+
+    Returns:
+        dict: Same keys as run_dryrun
+    """
+    logger = logging.getLogger(__name__)
+
+    store = get_store()
+    chunk_rows = current_app.config["UPLOAD_CHUNK_ROWS"]
+    set_ids = _create_dryrun_sets(
+        store, {"field": field_name, "object_type": object_type, "upload": os.path.basename(path)}
+    )
+    summary = {"total": 0, "changed": 0, "unchanged": 0, "missing_field": 0, "missing_object": 0, "failed": 0}
+    dryrun_count = 0
+    payloads_count = 0
+
+    try:
+        rows = iter_upload(path, file_format)
+        while chunk := list(islice(rows, chunk_rows)):
+            objects = []
+            missing_value = []
+            for row in chunk:
+                if not row.get("objectId"):
+                    continue
+                upload_object = {
+                    "objectId": str(row["objectId"]).strip(),
+                    "objectTypeId": row.get("objectTypeId") or object_type_id,
+                    "newValue": row.get(field_name)
+                }
+                if upload_object["newValue"] is None:
+                    missing_value.append(upload_object)
+                else:
+                    objects.append(upload_object)
+
+            rejected = len(chunk) - len(objects) - len(missing_value)
+            if rejected:
+                logger.warning("Skipping %d uploaded rows without objectId", rejected)
+                summary["total"] += rejected
+                summary["failed"] += rejected
+                if progress:
+                    progress(rejected)
+
+            if missing_value:
+                # a missing key must not clear the field in the DMS
+                logger.warning("Skipping %d uploaded rows without a value for %s", len(missing_value), field_name)
+                store.append(set_ids["dryrun_id"], [
+                    {
+                        "object_id": upload_object["objectId"],
+                        "object_type_id": upload_object["objectTypeId"],
+                        "status": "0",
+                        "change": "missing_field",
+                        "details": f"Upload row has no value for field '{field_name}'",
+                        "field": field_name,
+                        "current_value": "",
+                        "new_value": ""
+                    }
+                    for upload_object in missing_value
+                ])
+                summary["total"] += len(missing_value)
+                summary["missing_field"] += len(missing_value)
+                dryrun_count += len(missing_value)
+                if progress:
+                    progress(len(missing_value))
+            if not objects:
+                continue
+
+            dryrun_data = call_dryrun(objects, field_name, None, progress=progress, object_type=object_type)
+            if "error" in dryrun_data:
+                return {"error": dryrun_data["error"]}
+
+            _append_dryrun(store, set_ids, dryrun_data)
+            for key, value in dryrun_data["summary"].items():
+                summary[key] += value
+            dryrun_count += len(dryrun_data["result_dryrun"])
+            payloads_count += len(dryrun_data["result_payloads"])
+    finally:
+        os.remove(path)
+
+    logger.info(
+        "Upload dry run of %d rows stored as result sets %s (preview) and %s (payloads)",
+        summary["total"], set_ids["dryrun_id"], set_ids["payloads_id"]
+    )
+
+    return {
+        "summary": summary,
+        "dryrun_id": set_ids["dryrun_id"],
+        "dryrun_count": dryrun_count,
+        "payloads_id": set_ids["payloads_id"],
+        "payloads_count": payloads_count
+    }
+
+
+def create_update_journal(payloads_set_id):
+    """
+    Start the update journal of a new run over stored payloads.
+
+    The journal keeps the before-image of the dry run beyond the result store
+    TTL for a later rollback. The payloads are pinned until run_update finishes
+    the journal, so an interrupted run can still be resumed after the TTL.
+    """
+    store = get_store()
+    store.set_ttl(payloads_set_id, 0)
+    before_id = store.get_meta(payloads_set_id).get("before_id")
+    before_image = store.iter_rows(before_id) if before_id and store.exists(before_id) else None
+    return UpdateJournal.create(
+        current_app.config["UPDATE_JOURNAL_DIR"], payloads_set_id, store.count(payloads_set_id),
+        before_image=before_image
+    )
+
+
+def run_update(payloads_set_id, progress=None, run_id=None):
+    """
+    Execute the update payloads of a stored dry run.
+
+    Every outcome is written to an update journal. With the run_id of an
+    interrupted run, that journal is continued and committed objects are skipped.
+
+    Returns:
+        dict: 'results_id' result set id with the per-object outcomes, the 'summary'
+              and the 'run_id' of the journal
+    """
+    logger = logging.getLogger(__name__)
+
+    store = get_store()
+
+    journal_dir = current_app.config["UPDATE_JOURNAL_DIR"]
+    if run_id:
+        journal = UpdateJournal.open(journal_dir, run_id)
+        if journal is None:
+            raise ValueError(f"Update journal {run_id} not found")
+    else:
+        journal = create_update_journal(payloads_set_id)
+
+    # payloads are streamed from the store and outcomes appended per chunk, so memory stays bounded
+    results_id = store.create("update", {"payloads_id": payloads_set_id, "run_id": journal.run_id})
+    update_data = call_update(
+        store.iter_rows(payloads_set_id), progress=progress, journal=journal,
+        on_results=lambda results: store.append(results_id, results)
+    )
+    store.update_meta(results_id, summary=update_data["summary"])
+    # the journal is finished, the payloads are only needed for another run now
+    store.set_ttl(payloads_set_id)
+
+    logger.info("Update results stored as result set %s", results_id)
+
+    return {
+        "results_id": results_id,
+        "run_id": journal.run_id,
+        "summary": update_data["summary"],
+        "error": update_data.get("error")
+    }
+
+
+def run_rollback(run_id, progress=None):
+    """
+    Restore the before-values of an update run.
+
+    Builds restore payloads from the before-image in the journal of run_id,
+    limited to the objects that run wrote successfully, and executes them
+    through run_update with a journal of its own.
+
+    Returns:
+        dict: Result of run_update for the restore run
+    """
+    logger = logging.getLogger(__name__)
+
+    journal_dir = current_app.config["UPDATE_JOURNAL_DIR"]
+    journal = UpdateJournal.open(journal_dir, run_id)
+    if journal is None:
+        raise ValueError(f"Update journal {run_id} not found")
+
+    succeeded = journal.succeeded_object_ids()
+    restore_payloads = [
+        {
+            "properties": {
+                "system:objectId": {"value": before["objectId"]},
+                "system:objectTypeId": {"value": before["objectTypeId"]},
+                before["field"]: {"value": before["value"]}
+            }
+        }
+        for before in journal.before_image() if before["objectId"] in succeeded
+    ]
+
+    store = get_store()
+    payloads_id = store.create("payloads", {"rollback_of": run_id}, ttl_minutes=0)
+    store.append(payloads_id, restore_payloads)
+
+    rollback_journal = UpdateJournal.create(journal_dir, payloads_id, len(restore_payloads), rollback_of=run_id)
+    logger.info(
+        "Rolling back update run %s: restoring %d objects in run %s",
+        run_id, len(restore_payloads), rollback_journal.run_id
+    )
+
+    return run_update(payloads_id, progress=progress, run_id=rollback_journal.run_id)
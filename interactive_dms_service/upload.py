@@ -0,0 +1,93 @@
+"""Streaming parsers and schema validation for bulk update files"""
+
+import csv
+import json
+import logging
+from .schema_index import get_schema_index
+
+UPLOAD_FORMATS = {"csv": "csv", "ndjson": "ndjson", "jsonl": "ndjson"}
+KEY_COLUMNS = ("objectId", "objectTypeId")
+
+
+def upload_format(filename):
+    """Parser format for an uploaded file name, None if not supported"""
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return UPLOAD_FORMATS.get(extension)
+
+
+def iter_upload(path, file_format):
+    """
+    Generator over the rows of an uploaded file as dicts.
+
+    CSV files need a header line, NDJSON files hold one JSON object per line.
+    The file is read line by line, never as a whole.
+    """
+    logger = logging.getLogger(__name__)
+
+    with open(path, newline="", encoding="utf-8-sig") as upload_file:
+        if file_format == "csv":
+            yield from csv.DictReader(upload_file)
+            return
+
+        for line_no, line in enumerate(upload_file, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning("Skipping invalid NDJSON line %d: %s", line_no, e)
+                continue
+            if isinstance(row, dict):
+                yield row
+
+
+def read_columns(path, file_format):
+    """Column names of an uploaded file, from the CSV header or the first NDJSON row"""
+    for row in iter_upload(path, file_format):
+        return list(row.keys())
+    return []
+
+
+def count_rows(path, file_format):
+    """Number of data rows of an uploaded file, counted without parsing"""
+    with open(path, encoding="utf-8-sig") as upload_file:
+        rows = sum(1 for line in upload_file if line.strip())
+    return rows - 1 if file_format == "csv" and rows else rows
+
+
+def validate_columns(columns, object_type):
+    """
+    Check the columns of an upload against the schema of the object type.
+
+    The file needs an 'objectId' column, an optional 'objectTypeId' column and
+    exactly one further column, named like the internal name of the field to set.
+
+    Args:
+        columns (list): Column names of the upload
+        object_type (str): Internal name of the object type (folder)
+
+    Returns:
+        tuple: (field_name, object_type_id)
+
+    Raises:
+        ValueError: with a message for the user if the columns do not match
+    """
+    if "objectId" not in columns:
+        raise ValueError("Upload has no 'objectId' column")
+
+    field_columns = [column for column in columns if column not in KEY_COLUMNS]
+    if len(field_columns) != 1:
+        raise ValueError(f"Upload needs exactly one field column besides objectId, found {field_columns}")
+    field_name = field_columns[0]
+
+    schema_index = get_schema_index()
+    schema_error = schema_index.check(object_type, [field_name])
+    if schema_error:
+        raise ValueError(schema_error)
+
+    # the payloads need the object type id if the file has no objectTypeId column
+    object_type_id = schema_index.object_type_id(object_type)
+    if object_type_id is None:
+        raise ValueError(f"Schema of object type '{object_type}' not available")
+
+    return field_name, object_type_id